@@ -0,0 +1,113 @@
+"""
+Benchmark of ActionModelIndex queries against scans of the dedup output.
+
+Every predicate, condition, themrole and top-level role of the example
+filtered STRIPS output is queried once through the index and once by
+scanning the nested frames, the results must be identical.
+
+    python benchmarks/bench_action_index.py [path/to/extracted_filtered_STRIPS.json]
+"""
+import json
+import sys
+import time
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir/"src"))
+
+from vn2am.hierarchy import load_hierarchy  # noqa: E402
+from vn2am.index import ActionModelIndex, get_top_level_roles  # noqa: E402
+
+DEFAULT_INPUT = root_dir/"examples"/"extracted_filtered_STRIPS.json"
+
+
+def iter_frames(data):
+    for entry in data:
+        for i, frame in enumerate(entry['frames']):
+            yield entry['class_id'], i, frame
+
+
+def frame_roles(frame) -> set:
+    roles = set(frame['arguments'])
+    for bool_value, predicate, args in frame['preconditions'] + frame['postconditions']:
+        roles.update(arg for arg in args if arg != 'Event')
+    return roles
+
+
+def scan_effect(data, negated, predicate, args):
+    return [f"{class_id}-{i}" for class_id, i, frame in iter_frames(data)
+            if any((bool_value == 'not') == negated and pred == predicate
+                   and tuple(arg for arg in cond_args if arg != 'Event') == args
+                   for bool_value, pred, cond_args in frame['postconditions'])]
+
+
+def scan_predicate(data, predicate):
+    return [f"{class_id}-{i}" for class_id, i, frame in iter_frames(data)
+            if any(pred == predicate for _, pred, _ in frame['preconditions'] + frame['postconditions'])]
+
+
+def scan_themrole(data, themrole):
+    return [f"{class_id}-{i}" for class_id, i, frame in iter_frames(data)
+            if themrole in frame_roles(frame)]
+
+
+def scan_top_role(data, top_role, hierarchy):
+    return [f"{class_id}-{i}" for class_id, i, frame in iter_frames(data)
+            if any(top_role in get_top_level_roles(role, hierarchy) for role in frame_roles(frame))]
+
+
+def timed(queries) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        query()
+    return (time.perf_counter() - start) / max(len(queries), 1)
+
+
+def main(input_path=DEFAULT_INPUT):
+    with open(input_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    hierarchy = load_hierarchy()
+
+    start = time.perf_counter()
+    index = ActionModelIndex(data, hierarchy)
+    build_time = time.perf_counter() - start
+
+    effects = sorted({(bool_value == 'not', predicate, tuple(arg for arg in args if arg != 'Event'))
+                      for _, _, frame in iter_frames(data)
+                      for bool_value, predicate, args in frame['postconditions']})
+    predicates = sorted({pred for _, _, frame in iter_frames(data)
+                         for _, pred, _ in frame['preconditions'] + frame['postconditions']})
+    themroles = sorted(set().union(*(frame_roles(frame) for _, _, frame in iter_frames(data))))
+    top_roles = ['affector', 'undergoer', 'place', 'property']
+
+    def names(refs):
+        return [ref.name for ref in refs]
+
+    for effect in effects:
+        assert names(index.with_effect(effect)) == scan_effect(data, *effect), effect
+    for predicate in predicates:
+        assert names(index.query(predicate=predicate)) == scan_predicate(data, predicate), predicate
+    for themrole in themroles:
+        assert names(index.query(themrole=themrole)) == scan_themrole(data, themrole), themrole
+    for top_role in top_roles:
+        assert names(index.query(top_role=top_role)) == scan_top_role(data, top_role, hierarchy), top_role
+
+    print(f"action models: {len(index)}, index built in {build_time * 1e3:.1f} ms")
+    rows = [
+        ('effect', [lambda e=e: index.with_effect(e) for e in effects],
+                   [lambda e=e: scan_effect(data, *e) for e in effects]),
+        ('predicate', [lambda p=p: index.query(predicate=p) for p in predicates],
+                      [lambda p=p: scan_predicate(data, p) for p in predicates]),
+        ('themrole', [lambda t=t: index.query(themrole=t) for t in themroles],
+                     [lambda t=t: scan_themrole(data, t) for t in themroles]),
+        ('combined', [lambda p=p: index.query(predicate=p, negated=False, top_role='undergoer',
+                                              part='postconditions') for p in predicates],
+                     []),
+    ]
+    for name, index_queries, scan_queries in rows:
+        scan = f"scan {timed(scan_queries) * 1e6:9.1f} us/query" if scan_queries else ""
+        print(f"{name:10s} index {timed(index_queries) * 1e6:7.1f} us/query  {scan}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
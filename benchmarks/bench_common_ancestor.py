@@ -0,0 +1,57 @@
+"""
+Micro-benchmark and equivalence check of the closest common ancestor lookup.
+
+Compares find_closest_common_ancestor on the precomputed table and the
+memoized lookup against fresh ancestor walks for every pair of themroles
+in the hierarchy.
+
+    python benchmarks/bench_common_ancestor.py
+"""
+import json
+import sys
+import time
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir/"src"))
+
+from vn2am.semantic_tree import build_semantic_graph, build_value_node_map, \
+    build_common_ancestor_table, find_closest_common_ancestor, memoized_common_ancestor, \
+    search_closest_common_ancestor  # noqa: E402
+
+TREE_PATH = root_dir/"src"/"vn2am"/"data"/"vn_semanticrole_hierarchy.json"
+
+
+def run(lookup, pairs: list) -> tuple:
+    start = time.perf_counter()
+    results = [lookup(node1, node2) for node1, node2 in pairs]
+    return time.perf_counter() - start, results
+
+
+def main(repeat: int = 5):
+    with open(TREE_PATH, 'r', encoding='utf-8') as f:
+        tree_data = json.load(f)
+    root = build_semantic_graph(tree_data)
+    nodes = list(build_value_node_map(root).values())
+    pairs = [(node1, node2) for node1 in nodes for node2 in nodes]
+
+    search_time, expected = min((run(search_closest_common_ancestor, pairs) for _ in range(repeat)), key=lambda r: r[0])
+    memo_time, results = min((run(memoized_common_ancestor, pairs) for _ in range(repeat)), key=lambda r: r[0])
+    assert results == expected
+
+    start = time.perf_counter()
+    build_common_ancestor_table(root)
+    build_time = time.perf_counter() - start
+    table_time, results = min((run(find_closest_common_ancestor, pairs) for _ in range(repeat)), key=lambda r: r[0])
+    assert results == expected
+
+    print(f"pairs: {len(pairs)}")
+    print(f"table build: {build_time * 1000:.2f} ms")
+    print(f"ancestor walks: {search_time * 1000:.2f} ms")
+    print(f"memoized:       {memo_time * 1000:.2f} ms")
+    print(f"table:          {table_time * 1000:.2f} ms")
+    print(f"speedup:        {search_time / table_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark of the postcondition bookkeeping.
+
+get_all_condition is timed against the list based bookkeeping of the baseline
+converter (membership test and removal scan the postcondition list), loaded
+from git history, on random frames of growing length.
+tests/test_conditions.py checks that both give the same results.
+
+    python benchmarks/bench_condition_bookkeeping.py
+"""
+import random
+import subprocess
+import sys
+import time
+import types
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir/"src"))
+
+from vn2am import converter  # noqa: E402
+from vn2am.converter import get_all_condition  # noqa: E402
+from vn2am.model import Argument, Semantic  # noqa: E402
+
+# Commit of the converter before the postcondition bookkeeping changes
+BASELINE_COMMIT = 'bf25748'
+CONVERTER_PATH = 'src/vn2am/converter.py'
+PREDICATES = ['has_location', 'has_state', 'has_possession', 'motion', 'do', 'cause']
+EVENT_TAGS = ['e1', 'e2', 'e3', 'e4', 'E']
+
+
+def load_baseline_converter():
+    source = subprocess.run(
+        ['git', 'show', f'{BASELINE_COMMIT}:{CONVERTER_PATH}'], cwd=root_dir,
+        capture_output=True, text=True, check=True).stdout
+    module = types.ModuleType('baseline_converter')
+    # The baseline reads the predicate files from ../data next to its own directory
+    module.__file__ = str(Path(converter.__file__).parent/'baseline'/'converter.py')
+    exec(compile(source, f'{BASELINE_COMMIT}:{CONVERTER_PATH}', 'exec'), module.__dict__)
+    return module
+
+
+def random_semantic(rng: random.Random, values: list) -> Semantic:
+    events = (rng.choice(EVENT_TAGS),)
+    args = (Argument('Event', events[0]), Argument('ThemRole', rng.choice(values)))
+    return Semantic(events, rng.choice(PREDICATES), args, rng.choice([None, '!']))
+
+
+def run(split, semantic_lists, repeat=5) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for semantic_list in semantic_lists:
+            split(semantic_list)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    baseline = load_baseline_converter()
+    rng = random.Random(1)
+    for length in (10, 100, 1000, 5000):
+        # Many distinct keys so the postcondition list grows with the frame
+        values = [f"Role_{i}" for i in range(length)]
+        semantic_lists = [[random_semantic(rng, values) for _ in range(length)] for _ in range(max(1, 2000 // length))]
+        assert all(get_all_condition(semantic_list) == baseline.get_all_condition(semantic_list)
+                   for semantic_list in semantic_lists)
+        old_time = run(baseline.get_all_condition, semantic_lists)
+        new_time = run(get_all_condition, semantic_lists)
+        print(f"{length:5d} semantics: list scan {old_time / len(semantic_lists) * 1e6:10.1f} us/frame, "
+              f"ordered dict {new_time / len(semantic_lists) * 1e6:10.1f} us/frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Memory benchmark of the unfiltered action model representation.
+
+Builds the unfiltered model from its JSON output twice: as the dicts, lists
+and tuples produced before vn2am.model, and as ActionModel / Frame records
+with Semantic and Argument tuples and interned strings. Reports the memory
+retained by each representation.
+
+    python benchmarks/bench_data_model.py [path/to/extracted_unfiltered_STRIPS.json]
+"""
+import gc
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir/"src"))
+
+from vn2am.model import ActionModel, to_json  # noqa: E402
+
+DEFAULT_INPUT = root_dir/"examples"/"extracted_unfiltered_STRIPS.json"
+
+
+def plain_condition(cond):
+    arg_event, predicate, args, bool_value = cond
+    return (list(arg_event), predicate, [tuple(arg) for arg in args], bool_value)
+
+
+def plain_model(data: list) -> list:
+    """
+    The nested dicts, lists and tuples previously built by main
+    """
+    return [{
+        'class_id': entry['class_id'],
+        'frames': [{
+            'example_text': frame['example_text'],
+            'arguments': [tuple(arg) for arg in frame['arguments']],
+            'preconditions': [plain_condition(cond) for cond in frame['preconditions']],
+            'postconditions': [plain_condition(cond) for cond in frame['postconditions']],
+        } for frame in entry['frames']]
+    } for entry in data]
+
+
+def record_model(data: list) -> list:
+    return [ActionModel.from_dict(entry) for entry in data]
+
+
+def retained_memory(input_path, build) -> tuple:
+    """
+    Memory still allocated after building the model and dropping the parsed JSON
+    """
+    gc.collect()
+    tracemalloc.start()
+    with open(input_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    model = build(data)
+    del data
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, model
+
+
+def main(input_path=DEFAULT_INPUT):
+    plain_size, plain = retained_memory(input_path, plain_model)
+    record_size, records = retained_memory(input_path, record_model)
+    assert json.dumps(plain) == json.dumps(records, default=to_json)
+
+    print(f"JSON size on disk: {Path(input_path).stat().st_size / 1024:8.1f} KiB")
+    print(f"dicts and lists:   {plain_size / 1024:8.1f} KiB")
+    print(f"records:           {record_size / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
@@ -0,0 +1,111 @@
+"""
+Benchmark of the dedup frame keys.
+
+Builds the dedup key of every frame of the merged verb groups, once with the
+previous tuple keys (deepcopy of the condition lists) and once with the
+digest keys of format_frame_key, and reports wall time and peak memory.
+
+    python benchmarks/bench_dedup_keys.py [path/to/extracted_unfiltered_STRIPS.json]
+"""
+import copy
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir/"src"))
+
+from vn2am.dedup import format_frame_key, get_condition_texts, \
+    merge_subclass_frames, get_top_themrole  # noqa: E402
+from vn2am.hierarchy import load_hierarchy  # noqa: E402
+from vn2am.utils import get_argument_without_type, transform_hidden_arguments  # noqa: E402
+
+DEFAULT_INPUT = root_dir/"examples"/"extracted_unfiltered_STRIPS.json"
+semantic_tree = load_hierarchy().tree
+
+
+def deepcopy_tuple_key(conditions):
+    """
+    Previous format_tuple_key, kept as the reference
+    """
+    cond_key = copy.deepcopy(conditions)
+    for i, cond in enumerate(cond_key):
+        cond = list(cond)
+        cond[2] = [get_top_themrole(arg, semantic_tree) for arg in cond[2] if arg != "Event"]
+        cond[2] = sorted(cond[2], key=lambda x: str(x))
+        cond[2] = tuple(cond[2])
+        cond_key[i] = tuple(cond)
+    return tuple(cond_key)
+
+
+def deepcopy_frame_key(arguments, preconditions, postconditions):
+    arguments = sorted(arguments, key=lambda x: str(x))
+    parameters_key = tuple(get_top_themrole(arg, semantic_tree) for arg in arguments)
+    return (parameters_key, deepcopy_tuple_key(preconditions), deepcopy_tuple_key(postconditions))
+
+
+def prepare(strips_model: list) -> list:
+    """
+    Formatted (arguments, preconditions, postconditions) of every frame, per verb group
+    """
+    groups = []
+    for entry in merge_subclass_frames(strips_model):
+        frames = []
+        for frame in entry['frames']:
+            # merge_same_frame skips frames without effects
+            if not frame['postconditions']:
+                continue
+            arguments = transform_hidden_arguments(get_argument_without_type(frame))
+            frames.append((arguments,
+                           get_condition_texts(frame, 'preconditions'),
+                           get_condition_texts(frame, 'postconditions')))
+        groups.append(frames)
+    return groups
+
+
+def unique_frames(make_key, groups: list) -> int:
+    """
+    Keeps the unique keys of each group like merge_same_frame
+    """
+    unique_count = 0
+    for frames in groups:
+        unique_keys = {}
+        for frame in frames:
+            unique_keys.setdefault(make_key(*frame), frame)
+        unique_count += len(unique_keys)
+    return unique_count
+
+
+def run(make_key, groups: list) -> tuple:
+    """
+    Returns wall time, peak traced memory and the number of unique frames,
+    memory is traced in a separate pass so it does not slow down the timing
+    """
+    start = time.perf_counter()
+    unique_count = unique_frames(make_key, groups)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    unique_frames(make_key, groups)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, unique_count
+
+
+def main(input_path=DEFAULT_INPUT):
+    with open(input_path, 'r', encoding='utf-8') as f:
+        groups = prepare(json.load(f))
+
+    old_time, old_peak, old_unique = run(deepcopy_frame_key, groups)
+    new_time, new_peak, new_unique = run(format_frame_key, groups)
+    assert old_unique == new_unique
+
+    print(f"frames: {sum(len(frames) for frames in groups)}, unique: {new_unique}")
+    print(f"tuple keys with deepcopy: {old_time * 1000:8.2f} ms, peak {old_peak / 1024:8.1f} KiB")
+    print(f"digest keys:              {new_time * 1000:8.2f} ms, peak {new_peak / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
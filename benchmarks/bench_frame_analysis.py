@@ -0,0 +1,112 @@
+"""
+Benchmark of the single pass frame analysis.
+
+VerbNet frames are rebuilt from the example unfiltered output (the semantics
+of a frame are its preconditions followed by its postconditions). Each frame
+is analysed with the previous separate walks (event index, arguments,
+semantics and activity tag) and with parser.analyze_frame.
+
+    python benchmarks/bench_frame_analysis.py [path/to/extracted_unfiltered_STRIPS.json]
+"""
+import json
+import sys
+import time
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir/"src"))
+
+from vn2am.converter import is_activity_predicate  # noqa: E402
+from vn2am.hierarchy import load_hierarchy  # noqa: E402
+from vn2am.model import Argument, Semantic, intern  # noqa: E402
+from vn2am.parser import analyze_frame, get_example_text  # noqa: E402
+
+DEFAULT_INPUT = root_dir/"examples"/"extracted_unfiltered_STRIPS.json"
+
+
+def build_frames(strips_model: list) -> list:
+    frames = []
+    for entry in strips_model:
+        for frame in entry['frames']:
+            semantics = []
+            for _, predicate, args, bool_value in frame['preconditions'] + frame['postconditions']:
+                semantics.append({
+                    'predicate': predicate,
+                    'args': [{'arg_type': arg_type, 'value': value} for arg_type, value in args],
+                    'bool': bool_value,
+                })
+            examples = [{'example_text': text} for text in frame['example_text']]
+            frames.append({'examples': examples, 'semantics': semantics})
+    return frames
+
+
+# Previous implementation, one walk of frame['semantics'] per component
+
+def event_tags(args):
+    return [intern(arg.get('value')) for arg in args if arg.get('arg_type') == 'Event']
+
+
+def semantic_args(args):
+    return [Argument(intern(arg.get('arg_type')), intern(arg.get('value'))) for arg in args]
+
+
+def separate_walks(frame, themroles):
+    event_index = {}
+    for semantic in frame.get('semantics', []):
+        arg_event = event_tags(semantic.get('args', []))
+        if len(arg_event) == 1 and arg_event[0] not in event_index:
+            event_index[arg_event[0]] = len(event_index)
+
+    arguments = set()
+    for semantic in frame.get('semantics', []):
+        for arg_type, arg_value in semantic_args(semantic.get('args', [])):
+            if arg_type == 'ThemRole' or arg_value.removeprefix("?").lower() in themroles:
+                arguments.add(Argument(arg_type, arg_value))
+    arguments = sorted(arguments)
+
+    example_text = get_example_text(frame)
+
+    semantic_list = []
+    for semantic in frame.get('semantics', []):
+        args = semantic.get('args', [])
+        semantic_list.append(Semantic(tuple(event_tags(args)), intern(semantic.get('predicate')),
+                                      tuple(semantic_args(args)), intern(semantic.get('bool', None))))
+
+    activity_event_tag = None
+    for arg_event, predicate, _, _ in semantic_list:
+        if is_activity_predicate(predicate) and len(arg_event) == 1:
+            activity_event_tag = arg_event[0]
+            break
+    return event_index, arguments, example_text, semantic_list, activity_event_tag
+
+
+def single_pass(frame, themroles):
+    return analyze_frame(frame, themroles, is_activity_predicate)
+
+
+def run(analyze, frames, themroles, repeat=5) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for frame in frames:
+            analyze(frame, themroles)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(input_path=DEFAULT_INPUT):
+    with open(input_path, 'r', encoding='utf-8') as f:
+        frames = build_frames(json.load(f))
+    themroles = load_hierarchy().themroles
+
+    old_time = run(separate_walks, frames, themroles)
+    new_time = run(single_pass, frames, themroles)
+
+    print(f"frames: {len(frames)}")
+    print(f"separate walks (4 passes): {old_time / len(frames) * 1e6:7.2f} us/frame")
+    print(f"analyze_frame (1 pass):    {new_time / len(frames) * 1e6:7.2f} us/frame")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
@@ -0,0 +1,77 @@
+"""
+Benchmark of the shared themrole hierarchy against reloading the hierarchy file.
+
+Replays the hierarchy loads made by the class loop of main and the argument
+comparisons made by the link functions, once with load_themroles on every
+call as before, and once with a single ThemroleHierarchy.
+
+    python benchmarks/bench_hierarchy_context.py
+"""
+import json
+import sys
+import time
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir/"src"))
+
+from vn2am.hierarchy import ThemroleHierarchy  # noqa: E402
+from vn2am.links import LinkIndex, condition_key  # noqa: E402
+from vn2am.utils import compare_predicate_args, load_themroles  # noqa: E402
+
+TREE_PATH = root_dir/"src"/"vn2am"/"data"/"vn_semanticrole_hierarchy.json"
+UNFILTERED_PATH = root_dir/"examples"/"extracted_unfiltered_STRIPS.json"
+FILTERED_PATH = root_dir/"examples"/"extracted_filtered_STRIPS.json"
+
+
+def collect_comparisons(link_index: LinkIndex, am_data: list) -> list:
+    """
+    Argument pairs compared while linking preconditions to postconditions
+    """
+    pairs = []
+    for entry in am_data:
+        for frame in entry.get('frames', []):
+            for cond in frame.get('preconditions', []):
+                for _, _, other_args in link_index.postconditions.get(condition_key(cond), []):
+                    pairs.append((cond[2], other_args))
+    return pairs
+
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    with open(UNFILTERED_PATH, 'r', encoding='utf-8') as f:
+        class_count = len(json.load(f))
+    with open(FILTERED_PATH, 'r', encoding='utf-8') as f:
+        am_data = json.load(f)
+
+    hierarchy = ThemroleHierarchy.from_file(TREE_PATH)
+    pairs = collect_comparisons(LinkIndex(am_data, hierarchy=hierarchy), am_data)
+    value_to_node = hierarchy.value_to_node
+
+    def reload_per_class():
+        for _ in range(class_count):
+            load_themroles(TREE_PATH)
+
+    def reload_per_comparison():
+        for args1, args2 in pairs:
+            compare_predicate_args(args1, args2, value_to_node, load_themroles(TREE_PATH))
+
+    def shared_comparison():
+        for args1, args2 in pairs:
+            compare_predicate_args(args1, args2, value_to_node, hierarchy.themroles)
+
+    load_time = timed(lambda: ThemroleHierarchy.from_file(TREE_PATH))
+    print(f"classes: {class_count}, argument comparisons: {len(pairs)}")
+    print(f"hierarchy load (once):            {load_time * 1000:.2f} ms")
+    print(f"load_themroles per class:         {timed(reload_per_class) * 1000:.2f} ms")
+    print(f"comparisons, reload per call:     {timed(reload_per_comparison) * 1000:.2f} ms")
+    print(f"comparisons, shared hierarchy:    {timed(shared_comparison) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
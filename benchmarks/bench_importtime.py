@@ -0,0 +1,96 @@
+"""
+Cold start benchmark of the vn2am imports.
+
+Each target is imported in a fresh interpreter, with compiled bytecode cached
+in a temporary directory as an installed package would have it. The import
+time is the best of REPEAT runs and must stay below the budget of the target.
+The child processes also check that importing opens no data file (the package
+data in src/vn2am/data or the corpus in src/data), and
+print the slowest modules reported by `python -X importtime`.
+
+    python benchmarks/bench_importtime.py [REPEAT]
+
+Exits with status 1 when a target is over its budget or reads data files.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+src_dir = root_dir/"src"
+data_dirs = [src_dir/"vn2am"/"data", src_dir/"data"]
+
+# (name, import statement, budget in ms)
+TARGETS = [
+    ('vn2am', "import vn2am", 10),
+    ('formatting helpers',
+     "from vn2am.utils import formatted_predicate, remove_themrole_mark; "
+     "from vn2am.converter import format_filterd_2_pddl; "
+     "from vn2am.pddl import format_action, format_atom", 60),
+    ('cli', "import vn2am.cli", 120),
+]
+
+CHILD = """
+import json, os, sys, time
+data_dirs = tuple(sys.argv[1].split(os.pathsep))
+opened = []
+
+def audit(event, args):
+    if event == 'open' and isinstance(args[0], (str, bytes, os.PathLike)):
+        path = os.fsdecode(args[0])
+        if path.startswith(data_dirs):
+            opened.append(path)
+
+sys.addaudithook(audit)
+start = time.perf_counter()
+exec(sys.argv[2])
+elapsed = time.perf_counter() - start
+print(json.dumps({'seconds': elapsed, 'opened': opened}))
+"""
+
+
+def run_child(statement: str, env: dict, importtime: bool = False):
+    command = [sys.executable, *(['-X', 'importtime'] if importtime else []),
+               '-c', CHILD, os.pathsep.join(map(str, data_dirs)), statement]
+    return subprocess.run(command, capture_output=True, text=True, check=True, env=env, cwd=src_dir)
+
+
+def slowest_modules(stderr: str, count: int = 5) -> list:
+    """
+    Modules with the longest self time in the -X importtime report
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line.removeprefix('import time:').split('|')
+        rows.append((int(self_us), name.strip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main(repeat=5):
+    failed = False
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = dict(os.environ, PYTHONPATH=str(src_dir), PYTHONPYCACHEPREFIX=cache_dir)
+        env.pop('PYTHONDONTWRITEBYTECODE', None)
+        for name, statement, budget_ms in TARGETS:
+            # The first run compiles the bytecode
+            run_child(statement, env)
+            runs = [json.loads(run_child(statement, env).stdout) for _ in range(int(repeat))]
+            best_ms = min(run['seconds'] for run in runs) * 1e3
+            opened = sorted({path for run in runs for path in run['opened']})
+            status = 'ok' if best_ms <= budget_ms and not opened else 'FAIL'
+            failed = failed or status == 'FAIL'
+            print(f"{name:20s} {best_ms:7.1f} ms  (budget {budget_ms} ms)  {status}")
+            for path in opened:
+                print(f"    opened {path}")
+            slowest = slowest_modules(run_child(statement, env, importtime=True).stderr)
+            print("    slowest: " + ", ".join(f"{module} {self_us / 1e3:.1f} ms" for self_us, module in slowest))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*sys.argv[1:2]))
@@ -0,0 +1,101 @@
+"""
+Benchmark of the precomputed LinkGraph against the link dicts of LinkIndex.
+
+The example filtered STRIPS output is linked once with LinkIndex.link_all and
+once as a LinkGraph, the successors of every frame must be the same. Neighbor
+lookups and reachability are then timed on both: the dicts are inverted and
+walked by frame name, as the analysis did, while the graph walks its CSR arrays.
+
+    python benchmarks/bench_link_graph.py [path/to/extracted_filtered_STRIPS.json]
+"""
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir/"src"))
+
+from vn2am.graph import LinkGraph  # noqa: E402
+from vn2am.hierarchy import load_hierarchy  # noqa: E402
+from vn2am.links import LinkIndex  # noqa: E402
+
+DEFAULT_INPUT = root_dir/"examples"/"extracted_filtered_STRIPS.json"
+
+
+def dict_successors(all_links: list) -> dict:
+    """
+    {frame name: set of frame names} from the incoming links of every frame
+    """
+    successors = {}
+    for entry in all_links:
+        for i, frame_links in enumerate(entry['frames']):
+            name = f"{entry['class_id']}-{i}"
+            successors.setdefault(name, set())
+            for sources in frame_links['incoming_links'].values():
+                for source in sources:
+                    successors.setdefault(source, set()).add(name)
+    return successors
+
+
+def dict_reachable(successors: dict, source: str) -> set:
+    visited = set()
+    frontier = [source]
+    while frontier:
+        frame = frontier.pop()
+        for neighbor in successors[frame]:
+            if neighbor not in visited:
+                visited.add(neighbor)
+                frontier.append(neighbor)
+    return visited
+
+
+def timed(run, repeat: int = 5) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(input_path=DEFAULT_INPUT):
+    with open(input_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    hierarchy = load_hierarchy()
+
+    build_dicts = lambda: dict_successors(LinkIndex(data, hierarchy=hierarchy).link_all())
+    build_graph = lambda: LinkGraph.from_action_models(data, hierarchy)
+    successors = build_dicts()
+    graph = build_graph()
+
+    for frame_id, name in enumerate(graph.names):
+        assert {graph.names[i] for i in graph.successors(frame_id)} == successors[name], name
+        assert {graph.names[i] for i in graph.reachable(frame_id)} == dict_reachable(successors, name), name
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        graph_path = Path(tmp_dir)/"link_graph.bin"
+        graph.save(graph_path)
+        load_time = timed(lambda: LinkGraph.load(graph_path))
+        graph_size = graph_path.stat().st_size
+
+    components = graph.strongly_connected_components()
+    print(f"action models: {len(graph)}, links: {graph.num_edges}, "
+          f"components: {len(components)} (largest {max(map(len, components))})")
+    print(f"build      dicts {timed(build_dicts, 1) * 1e3:8.1f} ms  graph {timed(build_graph, 1) * 1e3:8.1f} ms")
+    print(f"load       graph {load_time * 1e3:8.2f} ms ({graph_size / 1024:.1f} KB)")
+    rows = [
+        ('successors', lambda: [successors[name] for name in graph.names],
+                       lambda: [graph.successors(i) for i in range(len(graph))]),
+        ('reachable', lambda: [dict_reachable(successors, name) for name in graph.names],
+                      lambda: [graph.reachable(i) for i in range(len(graph))]),
+    ]
+    for name, dict_run, graph_run in rows:
+        print(f"{name:10s} dicts {timed(dict_run) * 1e3:8.2f} ms  graph {timed(graph_run) * 1e3:8.2f} ms")
+    print(f"components graph {timed(graph.strongly_connected_components) * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
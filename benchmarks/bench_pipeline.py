@@ -0,0 +1,300 @@
+"""
+Benchmark of every pipeline stage on synthetic VerbNet-shaped corpora.
+
+For each scale a corpus is generated with benchmarks/corpus.py and written to
+a temporary file, then the stages run in order on it:
+
+    load        parser.get_VN_entries
+    analyze     parser.analyze_frame on every frame
+    conditions  converter.split_pre_post_conditions on every analysed frame
+    extract     cli.extract_class on every class (analysis, conditions, logging)
+    dedup       dedup.dedup
+    format      converter.format_filterd_2_pddl
+    links       links.LinkIndex.link_all on the deduplicated models
+    links-utils utils.link_pre_to_post / link_post_to_pre for a sample of frames
+    write       json.dump of the four outputs
+
+Wall time is the best of --repeat runs. Peak memory is measured in one more
+run under tracemalloc (peak above the memory in use when the stage starts).
+Results are saved as JSON, and two result files can be compared to catch
+regressions:
+
+    python benchmarks/bench_pipeline.py [--scales 1 10 100] [--frame-scale 1]
+        [--semantics-scale 1] [--repeat 3] [--output results.json]
+    python benchmarks/bench_pipeline.py --compare old.json new.json [--threshold 0.2]
+"""
+import argparse
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir/"src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from corpus import load_base_entries, scale_corpus, write_corpus  # noqa: E402
+from vn2am.cli import extract_class  # noqa: E402
+from vn2am.pipeline import Pipeline  # noqa: E402
+from vn2am import utils  # noqa: E402
+from vn2am.converter import PredicateFilter, format_filterd_2_pddl, split_pre_post_conditions  # noqa: E402
+from vn2am.dedup import dedup  # noqa: E402
+from vn2am.hierarchy import load_hierarchy  # noqa: E402
+from vn2am.links import LinkIndex  # noqa: E402
+from vn2am.model import to_json  # noqa: E402
+from vn2am.parser import analyze_frame, get_VN_entries  # noqa: E402
+
+RESULTS_DIR = Path(__file__).parent/"results"
+LINK_SAMPLE = 20
+
+
+def stage_load(state):
+    state['entries'] = get_VN_entries(state['corpus_path'])
+
+
+def stage_analyze(state):
+    themroles = state['hierarchy'].themroles
+    is_activity_predicate = state['predicate_filter'].is_activity_predicate
+    state['analyses'] = [analyze_frame(frame, themroles, is_activity_predicate)
+                         for entry in state['entries'] for frame in entry.get('frames', [])]
+
+
+def stage_conditions(state):
+    predicate_filter = state['predicate_filter']
+    # Contradiction warnings are printed, keep them out of the report
+    with redirect_stdout(io.StringIO()):
+        state['conditions'] = [
+            split_pre_post_conditions(analysis.semantics, analysis.event_index,
+                                      analysis.activity_event_tag, predicate_filter)
+            for analysis in state['analyses']]
+
+
+def stage_extract(state):
+    pipeline = Pipeline(state['hierarchy'], state['predicate_filter'])
+    strips_model = []
+    examples = []
+    with redirect_stdout(io.StringIO()):
+        for entry in state['entries']:
+            strips_data, class_examples = extract_class(entry, pipeline)
+            if strips_data is None:
+                continue
+            strips_model.append(strips_data)
+            examples.extend(class_examples)
+    state['strips_model'] = strips_model
+    state['examples'] = examples
+
+
+def stage_dedup(state):
+    state['deduped'] = dedup(state['strips_model'], state['hierarchy'])
+
+
+def stage_format(state):
+    state['pddl'] = format_filterd_2_pddl(state['deduped'])
+
+
+def stage_links(state):
+    LinkIndex(state['deduped'], hierarchy=state['hierarchy']).link_all()
+
+
+def stage_links_utils(state):
+    hierarchy = state['hierarchy']
+    am_data = state['deduped']
+    frames = [frame for entry in am_data for frame in entry['frames']][:LINK_SAMPLE]
+    for frame in frames:
+        utils.link_pre_to_post(frame['preconditions'], am_data, hierarchy.value_to_node, hierarchy)
+        utils.link_post_to_pre(frame['postconditions'], am_data, hierarchy.value_to_node, hierarchy)
+
+
+def stage_write(state):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        outputs = [
+            ('unfiltered', state['strips_model'], to_json),
+            ('filtered', state['deduped'], None),
+            ('examples', state['examples'], None),
+            ('pddl', state['pddl'], None),
+        ]
+        for name, data, default in outputs:
+            with open(Path(tmp_dir)/f"{name}.json", 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, default=default)
+
+
+STAGES = [
+    ('load', stage_load),
+    ('analyze', stage_analyze),
+    ('conditions', stage_conditions),
+    ('extract', stage_extract),
+    ('dedup', stage_dedup),
+    ('format', stage_format),
+    ('links', stage_links),
+    ('links-utils', stage_links_utils),
+    ('write', stage_write),
+]
+
+
+def run_stages(corpus_path, trace_memory: bool = False) -> dict:
+    """
+    Runs every stage once, returns {stage: seconds} or {stage: peak bytes}
+    """
+    state = {
+        'corpus_path': corpus_path,
+        'hierarchy': load_hierarchy(),
+        'predicate_filter': PredicateFilter.from_profile('default'),
+    }
+    measures = {}
+    for name, stage in STAGES:
+        if trace_memory:
+            tracemalloc.reset_peak()
+            start = tracemalloc.get_traced_memory()[0]
+            stage(state)
+            measures[name] = tracemalloc.get_traced_memory()[1] - start
+        else:
+            start = time.perf_counter()
+            stage(state)
+            measures[name] = time.perf_counter() - start
+    return measures
+
+
+def bench_scale(base_entries: list, scale: float, frame_scale: float,
+                semantics_scale: float, repeat: int, seed: int) -> dict:
+    entries = scale_corpus(base_entries, scale, frame_scale, semantics_scale, seed)
+    frames = [frame for entry in entries for frame in entry.get('frames', [])]
+    frame_count = len(frames)
+    semantics_count = sum(len(frame.get('semantics', [])) for frame in frames)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus_path = Path(tmp_dir)/"verbnet.json"
+        write_corpus(entries, corpus_path)
+        del entries, frames
+
+        seconds = {}
+        for _ in range(repeat):
+            for name, elapsed in run_stages(corpus_path).items():
+                seconds[name] = min(seconds.get(name, elapsed), elapsed)
+
+        tracemalloc.start()
+        try:
+            peak_bytes = run_stages(corpus_path, trace_memory=True)
+        finally:
+            tracemalloc.stop()
+
+    return {
+        'corpus': {
+            'scale': scale,
+            'frame_scale': frame_scale,
+            'semantics_scale': semantics_scale,
+            'seed': seed,
+            'frames': frame_count,
+            'semantics': semantics_count,
+        },
+        'stages': {name: {'seconds': seconds[name], 'peak_bytes': peak_bytes[name]}
+                   for name, _ in STAGES},
+    }
+
+
+def get_commit() -> str:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=root_dir,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=root_dir,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return f"{commit}-dirty" if dirty else commit
+
+
+def print_run(run: dict):
+    corpus = run['corpus']
+    print(f"scale {corpus['scale']}x (frames {corpus['frame_scale']}x, semantics {corpus['semantics_scale']}x): "
+          f"{corpus['frames']} frames, {corpus['semantics']} semantics")
+    for name, measure in run['stages'].items():
+        print(f"  {name:12s} {measure['seconds'] * 1e3:10.1f} ms {measure['peak_bytes'] / 2**20:10.1f} MB")
+
+
+def compare(old_path, new_path, threshold: float) -> int:
+    """
+    Prints the time ratio of every stage of runs with the same corpus,
+    returns the number of stages slower than 1 + threshold
+    """
+    with open(old_path, 'r', encoding='utf-8') as f:
+        old = json.load(f)
+    with open(new_path, 'r', encoding='utf-8') as f:
+        new = json.load(f)
+    print(f"{old['commit']} -> {new['commit']}")
+
+    old_runs = {json.dumps(run['corpus'], sort_keys=True): run for run in old['runs']}
+    regressions = 0
+    for run in new['runs']:
+        old_run = old_runs.get(json.dumps(run['corpus'], sort_keys=True))
+        if old_run is None:
+            continue
+        print(f"scale {run['corpus']['scale']}x")
+        for name, measure in run['stages'].items():
+            old_measure = old_run['stages'].get(name)
+            if old_measure is None or old_measure['seconds'] == 0:
+                continue
+            ratio = measure['seconds'] / old_measure['seconds']
+            memory_ratio = measure['peak_bytes'] / max(old_measure['peak_bytes'], 1)
+            regressed = ratio > 1 + threshold
+            regressions += regressed
+            print(f"  {name:12s} time x{ratio:5.2f}  memory x{memory_ratio:5.2f}"
+                  f"{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage")
+    parser.add_argument('--scales', type=float, nargs='+', default=[1],
+                        help="number of classes relative to the base corpus (default: 1)")
+    parser.add_argument('--frame-scale', type=float, default=1,
+                        help="frames per class relative to the base corpus (default: 1)")
+    parser.add_argument('--semantics-scale', type=float, default=1,
+                        help="semantics per frame relative to the base corpus (default: 1)")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="timed runs per scale, the best one is kept (default: 3)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--input', type=Path,
+                        help="VerbNet file used as the base corpus (default: src/data/verbnet3.4.json "
+                             "or classes rebuilt from examples/)")
+    parser.add_argument('--output', type=Path,
+                        help="result file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument('--compare', type=Path, nargs=2, metavar=('OLD', 'NEW'),
+                        help="compare two result files instead of running")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="slowdown reported as a regression by --compare (default: 0.2)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.compare:
+        return 1 if compare(*args.compare, args.threshold) else 0
+
+    base_entries = load_base_entries(args.input)
+    results = {
+        'commit': get_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'runs': [],
+    }
+    for scale in args.scales:
+        run = bench_scale(base_entries, scale, args.frame_scale, args.semantics_scale,
+                          args.repeat, args.seed)
+        print_run(run)
+        results['runs'].append(run)
+
+    output = args.output or RESULTS_DIR/f"{results['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
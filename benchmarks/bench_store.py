@@ -0,0 +1,115 @@
+"""
+Benchmark of the binary action model store against the JSON outputs.
+
+The example filtered STRIPS output is repeated SCALE times (copies get a new
+class_id) and written as JSON, as PDDL JSON and as a binary store. Each
+loading mode then runs in a fresh process, which reports its startup time
+(load and first access to one class) and its peak RSS:
+
+    json    json.load of the filtered STRIPS and PDDL outputs
+    store   ActionModelStore, then one class and its PDDL form
+
+    python benchmarks/bench_store.py [SCALE] [path/to/extracted_filtered_STRIPS.json]
+"""
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir/"src"))
+
+from vn2am.converter import format_filterd_2_pddl  # noqa: E402
+from vn2am.store import ActionModelStore, write_action_model_store  # noqa: E402
+
+DEFAULT_INPUT = root_dir/"examples"/"extracted_filtered_STRIPS.json"
+
+
+def load_json(strips_path, pddl_path):
+    with open(strips_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    with open(pddl_path, 'r', encoding='utf-8') as f:
+        json.load(f)
+    return data[len(data) // 2]
+
+
+def load_store(store_path):
+    store = ActionModelStore(store_path)
+    entry = store[len(store) // 2]
+    store.get_pddl(len(store) // 2)
+    return entry
+
+
+def child(mode: str, *paths):
+    """
+    Runs one loading mode, prints its time and peak RSS as JSON
+    """
+    start = time.perf_counter()
+    if mode == 'json':
+        load_json(*paths)
+    else:
+        load_store(*paths)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is in KB on Linux
+    print(json.dumps({'seconds': elapsed,
+                      'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}))
+
+
+def run_child(mode: str, *paths, repeat: int = 5) -> dict:
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, __file__, '--child', mode, *map(str, paths)],
+                                capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(output))
+    return min(runs, key=lambda run: run['seconds'])
+
+
+def scale_model(data: list, scale: int) -> list:
+    return [dict(entry, class_id=f"{entry['class_id']}{copy or ''}")
+            for copy in range(scale) for entry in data]
+
+
+def main(scale=1, input_path=DEFAULT_INPUT):
+    with open(input_path, 'r', encoding='utf-8') as f:
+        data = scale_model(json.load(f), int(scale))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        strips_path = Path(tmp_dir)/"filtered.json"
+        pddl_path = Path(tmp_dir)/"pddl.json"
+        store_path = Path(tmp_dir)/"action_models.bin"
+        with open(strips_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        with open(pddl_path, 'w', encoding='utf-8') as f:
+            json.dump(format_filterd_2_pddl(data), f, indent=2)
+        write_action_model_store(data, store_path)
+
+        # Both modes give the same class
+        with ActionModelStore(store_path) as store:
+            assert store.to_list() == data
+
+        # Interpreter and import cost, subtracted from both modes
+        baseline = run_child('none')
+        json_run = run_child('json', strips_path, pddl_path)
+        store_run = run_child('store', store_path)
+
+        print(f"classes: {len(data)}")
+        print(f"file size: json {(strips_path.stat().st_size + pddl_path.stat().st_size) / 1024:9.1f} KB, "
+              f"store {store_path.stat().st_size / 1024:9.1f} KB")
+        for name, run in (('json.load', json_run), ('store', store_run)):
+            print(f"{name:10s} startup {run['seconds'] * 1e3:8.2f} ms, "
+                  f"RSS +{(run['max_rss_kb'] - baseline['max_rss_kb']) / 1024:7.1f} MB")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ['--child']:
+        mode = sys.argv[2]
+        if mode == 'none':
+            print(json.dumps({'seconds': 0.0,
+                              'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}))
+        else:
+            child(mode, *sys.argv[3:])
+    else:
+        main(*sys.argv[1:3])
@@ -0,0 +1,63 @@
+"""
+Micro-benchmark of the top themrole lookup used by the dedup keys.
+
+Replays every themrole lookup that dedup makes over the unfiltered STRIPS
+output and compares the tree search with the precomputed index.
+
+    python benchmarks/bench_top_themrole.py [path/to/extracted_unfiltered_STRIPS.json]
+"""
+import json
+import sys
+import time
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir/"src"))
+
+from vn2am.dedup import get_top_themrole, search_top_themrole  # noqa: E402
+from vn2am.hierarchy import load_hierarchy  # noqa: E402
+from vn2am.utils import formatted_predicate, get_argument_without_type, \
+    transform_hidden_arguments  # noqa: E402
+
+DEFAULT_INPUT = root_dir/"examples"/"extracted_unfiltered_STRIPS.json"
+semantic_tree = load_hierarchy().tree
+
+
+def collect_lookups(strips_model: list) -> list:
+    """
+    All themroles passed to get_top_themrole by format_parameters_key and format_tuple_key
+    """
+    lookups = []
+    for entry in strips_model:
+        for frame in entry.get('frames', []):
+            lookups.extend(transform_hidden_arguments(get_argument_without_type(frame)))
+            for name in ('preconditions', 'postconditions'):
+                for cond in frame.get(name, []):
+                    args = formatted_predicate(cond)[2]
+                    lookups.extend(arg for arg in args if arg != "Event")
+    return lookups
+
+
+def run(lookup, lookups: list) -> tuple:
+    start = time.perf_counter()
+    results = [lookup(themrole, semantic_tree) for themrole in lookups]
+    return time.perf_counter() - start, results
+
+
+def main(input_path=DEFAULT_INPUT, repeat: int = 5):
+    with open(input_path, 'r', encoding='utf-8') as f:
+        strips_model = json.load(f)
+    lookups = collect_lookups(strips_model)
+
+    search_time = min(run(search_top_themrole, lookups)[0] for _ in range(repeat))
+    index_time = min(run(get_top_themrole, lookups)[0] for _ in range(repeat))
+    assert run(search_top_themrole, lookups)[1] == run(get_top_themrole, lookups)[1]
+
+    print(f"lookups: {len(lookups)}")
+    print(f"tree search: {search_time * 1000:.2f} ms")
+    print(f"index:       {index_time * 1000:.2f} ms")
+    print(f"speedup:     {search_time / index_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
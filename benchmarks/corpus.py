@@ -0,0 +1,155 @@
+"""
+Synthetic VerbNet-shaped corpora for the benchmarks.
+
+A base corpus (the VerbNet 3.4 file when it is present, otherwise classes
+rebuilt from the example unfiltered output) is scaled along three axes:
+
+    scale           number of classes, copies of base classes get a new verb
+                    so each copy is its own dedup group
+    frame_scale     frames per class, extra frames are drawn from the whole base
+    semantics_scale semantics per frame, semantics of other frames are appended
+                    with their event tags shifted after the ones of the frame
+
+The result has the same JSON shape as the VerbNet file and is deterministic
+for a given seed.
+
+    python benchmarks/corpus.py SCALE [FRAME_SCALE] [SEMANTICS_SCALE] > corpus.json
+"""
+import json
+import random
+import re
+import sys
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+VERBNET_PATH = root_dir/"src"/"data"/"verbnet3.4.json"
+EXAMPLE_STRIPS_PATH = root_dir/"examples"/"extracted_unfiltered_STRIPS.json"
+
+EVENT_TAG = re.compile(r'^(e|ë)(\d+)$')
+
+
+def rebuild_entries(strips_model: list) -> list:
+    """
+    VerbNet entries rebuilt from extracted STRIPS data, the semantics of a frame
+    are its preconditions followed by its postconditions. Filtered predicates
+    are not in the STRIPS data, so these frames have no activity predicate.
+    """
+    entries = []
+    for strips_data in strips_model:
+        frames = []
+        for frame in strips_data['frames']:
+            semantics = []
+            for _, predicate, args, bool_value in frame['preconditions'] + frame['postconditions']:
+                semantic = {
+                    'predicate': predicate,
+                    'args': [{'arg_type': arg_type, 'value': value} for arg_type, value in args],
+                }
+                if bool_value is not None:
+                    semantic['bool'] = bool_value
+                semantics.append(semantic)
+            frames.append({
+                'examples': [{'example_text': text} for text in frame['example_text']],
+                'semantics': semantics,
+            })
+        entries.append({'class_id': strips_data['class_id'], 'themroles': [], 'frames': frames})
+    return entries
+
+
+def load_base_entries(path=None) -> list:
+    """
+    Entries of the VerbNet file at path, or of the real corpus when it is present
+    """
+    path = Path(path) if path else (VERBNET_PATH if VERBNET_PATH.exists() else None)
+    if path is None:
+        with open(EXAMPLE_STRIPS_PATH, 'r', encoding='utf-8') as f:
+            return rebuild_entries(json.load(f))
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('VerbNet', [])
+
+
+def copy_class_id(class_id: str, copy_number: int) -> str:
+    """
+    Class id of a copy, the verb before the first hyphen gets a suffix
+    """
+    if copy_number == 0:
+        return class_id
+    verb, _, rest = class_id.partition('-')
+    return f"{verb}{copy_number}-{rest}" if rest else f"{verb}{copy_number}"
+
+
+def get_event_number(frame: dict) -> int:
+    """
+    Highest event number used in the semantics of a frame
+    """
+    number = 0
+    for semantic in frame.get('semantics', []):
+        for arg in semantic.get('args', []):
+            match = EVENT_TAG.match(str(arg.get('value'))) if arg.get('arg_type') == 'Event' else None
+            if match:
+                number = max(number, int(match.group(2)))
+    return number
+
+
+def shift_events(semantics: list, offset: int) -> list:
+    """
+    Copy of semantics with every numbered event tag moved by offset
+    """
+    shifted = []
+    for semantic in semantics:
+        args = []
+        for arg in semantic.get('args', []):
+            match = EVENT_TAG.match(str(arg.get('value'))) if arg.get('arg_type') == 'Event' else None
+            if match:
+                arg = dict(arg, value=f"{match.group(1)}{int(match.group(2)) + offset}")
+            args.append(arg)
+        shifted.append(dict(semantic, args=args))
+    return shifted
+
+
+def lengthen_frame(frame: dict, others: list, semantics_scale: float, rng: random.Random) -> dict:
+    """
+    Appends semantics of other frames until the frame has semantics_scale times its semantics
+    """
+    semantics = list(frame.get('semantics', []))
+    target = round(len(semantics) * semantics_scale)
+    offset = get_event_number(frame)
+    while len(semantics) < target:
+        other = rng.choice(others)
+        extra = shift_events(other.get('semantics', []), offset)
+        semantics.extend(extra[:target - len(semantics)])
+        offset += get_event_number(other)
+    return dict(frame, semantics=semantics)
+
+
+def scale_corpus(base_entries: list, scale: float = 1, frame_scale: float = 1,
+                 semantics_scale: float = 1, seed: int = 0) -> list:
+    """
+    VerbNet entries scaled from base_entries
+    """
+    rng = random.Random(seed)
+    all_frames = [frame for entry in base_entries for frame in entry.get('frames', [])]
+    if not all_frames:
+        return []
+
+    entries = []
+    for i in range(round(len(base_entries) * scale)):
+        base = base_entries[i % len(base_entries)]
+        frames = list(base.get('frames', []))
+        target = round(len(frames) * frame_scale)
+        frames = frames[:target] + [rng.choice(all_frames) for _ in range(target - len(frames))]
+        if semantics_scale != 1:
+            frames = [lengthen_frame(frame, all_frames, semantics_scale, rng) for frame in frames]
+        entries.append(dict(base,
+                            class_id=copy_class_id(base.get('class_id', 'null'), i // len(base_entries)),
+                            frames=frames))
+    return entries
+
+
+def write_corpus(entries: list, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'VerbNet': entries}, f)
+
+
+if __name__ == "__main__":
+    factors = [float(value) for value in sys.argv[1:4]]
+    json.dump({'VerbNet': scale_corpus(load_base_entries(), *factors)}, sys.stdout)
@@ -0,0 +1,40 @@
+import importlib
+
+# Public names and their submodules. They are imported on first access, so
+# `import vn2am` stays cheap and reads no data files. dedup and metrics are
+# left out: the submodules of the same name would replace them once imported.
+_EXPORTS = {
+    'ActionModel': 'vn2am.model',
+    'Frame': 'vn2am.model',
+    'to_json': 'vn2am.model',
+    'iter_VN_entries': 'vn2am.parser',
+    'analyze_frame': 'vn2am.parser',
+    'PredicateFilter': 'vn2am.converter',
+    'split_pre_post_conditions': 'vn2am.converter',
+    'format_filterd_2_pddl': 'vn2am.converter',
+    'ThemroleHierarchy': 'vn2am.hierarchy',
+    'load_hierarchy': 'vn2am.hierarchy',
+    'LinkIndex': 'vn2am.links',
+    'LinkGraph': 'vn2am.graph',
+    'ActionModelIndex': 'vn2am.index',
+    'ActionModelStore': 'vn2am.store',
+    'write_action_model_store': 'vn2am.store',
+    'write_pddl_domain': 'vn2am.pddl',
+    'JSONArrayWriter': 'vn2am.writer',
+    'Pipeline': 'vn2am.pipeline',
+    'PipelineResult': 'vn2am.pipeline',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
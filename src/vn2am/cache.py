@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from vn2am.model import to_json
+
+src_dir = Path(__file__).parent
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def get_code_version(extra_paths: list = ()) -> str:
+    """
+    Digest of the package source and any extra source files,
+    so a code change invalidates cached results
+    """
+    digest = hashlib.sha256()
+    for path in sorted(src_dir.glob('*.py')) + [Path(p) for p in extra_paths]:
+        digest.update(path.name.encode('utf-8'))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    On-disk cache of per class extraction results.
+    Each result is stored under a digest of the class JSON and of every input
+    the extraction depends on (input files, code version and any extra context
+    such as the predicate filter).
+    Files that were not used recently are evicted when the cache exceeds max_bytes.
+    """
+    def __init__(self, cache_dir, input_paths: list, code_version: str = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES, extra_context: str = ''):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        context = hashlib.sha256()
+        for path in input_paths:
+            context.update(Path(path).read_bytes())
+        context.update((code_version or get_code_version()).encode('utf-8'))
+        context.update(extra_context.encode('utf-8'))
+        self.context = context.digest()
+
+    def key(self, entry: dict) -> str:
+        class_json = json.dumps(
+            entry, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+        digest = hashlib.sha256(self.context)
+        digest.update(class_json.encode('utf-8'))
+        return digest.hexdigest()
+
+    def path(self, key: str) -> Path:
+        return self.cache_dir/key[:2]/f"{key}.json"
+
+    def get(self, key: str):
+        path = self.path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        # Mark as recently used
+        os.utime(path)
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value):
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(value, f, default=to_json)
+        os.replace(tmp_path, path)
+
+    def evict(self) -> int:
+        """
+        Removes least recently used files until the cache fits in max_bytes,
+        returns the number of removed files
+        """
+        files = []
+        total = 0
+        for path in self.cache_dir.glob('*/*.json'):
+            stat = path.stat()
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        removed = 0
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            path.unlink()
+            total -= size
+            removed += 1
+        return removed
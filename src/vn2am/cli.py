@@ -0,0 +1,589 @@
+import argparse
+import io
+import json
+import logging
+import sys
+from collections import deque
+from contextlib import contextmanager, redirect_stdout
+from itertools import islice
+from pathlib import Path
+from vn2am.parser import log_example_text, log_semantics, log_argument
+from vn2am.converter import PredicateFilter, FILTER_PROFILES
+from vn2am.cache import ExtractionCache, DEFAULT_MAX_BYTES, get_code_version
+from vn2am.graph import LinkGraph
+from vn2am.hierarchy import load_hierarchy, SEMANTIC_TREE_PATH
+from vn2am.metrics import metrics, PROFILE_ENV
+from vn2am.pddl import write_pddl_domain
+from vn2am.pipeline import Pipeline
+from vn2am.store import write_action_model_store
+from vn2am.model import ActionModel, to_json
+from vn2am.writer import JSONArrayWriter, OUTPUT_FORMATS
+
+# The input and the outputs are relative to the current working directory
+# (--input and --output-dir), the themrole hierarchy is package data
+INPUT_FILE_PATH = Path("src")/"data"/"verbnet3.4.json"
+TREE_PATH = SEMANTIC_TREE_PATH
+OUTPUT_DIR = Path("output")
+UNFILTERED_STRIPS_PATH = OUTPUT_DIR/"extracted_unfiltered_STRIPS.json"
+FILTERED_STRIPS_PATH= OUTPUT_DIR/"extracted_filtered_STRIPS.json"
+EXAMPLE_TEXT_PATH = OUTPUT_DIR/"extracted_example_texts.json"
+LOG_FILE_PATH = OUTPUT_DIR/"extracted_unfiltered_STRIPS.log"
+PDDL_FILE_PATH = OUTPUT_DIR/"extracted_PDDL.json"
+PDDL_DOMAIN_PATH = OUTPUT_DIR/"extracted_domain.pddl"
+ACTION_MODEL_STORE_PATH = OUTPUT_DIR/"extracted_action_models.bin"
+LINK_GRAPH_PATH = OUTPUT_DIR/"extracted_link_graph.bin"
+CACHE_DIR = OUTPUT_DIR/".cache"
+METRICS_PATH = OUTPUT_DIR/"metrics.json"
+BATCH_OUTPUT_DIR = OUTPUT_DIR/"batch"
+# Outputs written only when asked for with --extra-outputs
+EXTRA_OUTPUTS = ('domain', 'store', 'link-graph')
+BATCH_KEYS = ('name', 'filter_profile', 'activity_predicates', 'temporal_predicates',
+              'hierarchy', 'merge_subclasses', 'output_dir')
+
+
+class LogCollector(logging.Handler):
+    """
+    Keeps log messages in memory so a worker can hand them back to the parent
+    """
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def extract_class(entry: dict, pipeline: Pipeline, analyses: list = None) -> tuple:
+    """
+    Extracts the action models of one VerbNet class with the analyze and
+    conditions stages of the pipeline, returns the STRIPS data and example
+    texts of the class. analyses (made by Pipeline.parse_class) are used
+    instead of parsing the frames again.
+    """
+    class_id = entry.get('class_id', 'null')
+    examples = []
+
+    if class_id == 'null':
+        return None, examples
+    logging.info(f"\nClass ID: {class_id}")
+
+    # One pass over the semantics of each frame gives every component of the frame
+    class_id, analyses = pipeline.analyze_class(entry, analyses)
+
+    # In each frame, extract action model components based on annotation
+    strips_data = pipeline.action_model(class_id, analyses)
+
+    for i, frame_data in enumerate(strips_data.frames):
+        # Plain text example texts
+        example_texts = {
+            'example_text': frame_data.example_text
+        }
+        examples.append(example_texts)
+
+        # Logging in readable format
+        logging.info(f"\tFrame {i + 1}:")
+        log_example_text(frame_data.example_text)
+        log_argument(frame_data.arguments)
+        logging.info("\tPreconditions:")
+        log_semantics(frame_data.preconditions)
+        logging.info("\tPostconditions:")
+        log_semantics(frame_data.postconditions)
+
+    return strips_data, examples
+
+
+@contextmanager
+def capture_output():
+    """
+    Collects log messages and printed text in memory instead of writing them
+    """
+    collector = LogCollector()
+    stdout = io.StringIO()
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(collector)
+    root.setLevel(logging.INFO)
+    try:
+        with redirect_stdout(stdout):
+            yield collector, stdout
+    finally:
+        root.removeHandler(collector)
+        for handler in handlers:
+            root.addHandler(handler)
+        root.setLevel(level)
+
+
+def extract_class_output(entry: dict, pipeline: Pipeline, analyses: list = None) -> dict:
+    """
+    Runs extract_class and returns its result with the log messages, printed
+    text and metrics of the class, so they can be replayed in entry order
+    """
+    with capture_output() as (collector, stdout), metrics.capture() as captured:
+        strips_data, examples = extract_class(entry, pipeline, analyses)
+    result = {
+        'strips_data': strips_data,
+        'examples'   : examples,
+        'messages'   : collector.messages,
+        'printed'    : stdout.getvalue(),
+        'counters'   : captured.counters,
+    }
+    if captured.enabled:
+        # Timings of this run only, they are not cached
+        result['stages'] = captured.stages
+    return result
+
+
+def extract_class_chunk(entries: list, pipeline: Pipeline) -> list:
+    """
+    Runs extract_class_output in a worker for a chunk of entries
+    """
+    return [extract_class_output(entry, pipeline) for entry in entries]
+
+
+def lookup_cache(entries, cache: ExtractionCache = None):
+    """
+    Pairs each entry with its cache key and cached result (None on a miss)
+    """
+    for entry in entries:
+        if cache is None:
+            yield entry, None, None
+            continue
+        key = cache.key(entry)
+        cached = cache.get(key)
+        if cached is not None and cached['strips_data'] is not None:
+            cached['strips_data'] = ActionModel.from_dict(cached['strips_data'])
+        yield entry, key, cached
+
+
+def extract_serial(items, pipeline: Pipeline):
+    for entry, key, cached in items:
+        if cached is not None:
+            yield key, cached, True
+        elif key is None:
+            # Without a cache the result is not kept, so messages and printed text
+            # go straight to the log and stdout instead of being replayed
+            strips_data, examples = extract_class(entry, pipeline)
+            yield key, {'strips_data': strips_data, 'examples': examples,
+                        'messages': [], 'printed': ''}, False
+        else:
+            yield key, extract_class_output(entry, pipeline), False
+
+
+def extract_parallel(items, pipeline: Pipeline, workers: int, chunk_size: int):
+    """
+    Sends chunks of uncached entries to a process pool and yields the results
+    in the original order. Only a bounded number of chunks are in flight, so
+    the entries are still read lazily.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    items = iter(items)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        while True:
+            while len(pending) < workers * 2:
+                chunk = list(islice(items, chunk_size))
+                if not chunk:
+                    break
+                missed = [entry for entry, _, cached in chunk if cached is None]
+                future = executor.submit(extract_class_chunk, missed, pipeline) if missed else None
+                pending.append((chunk, future))
+            if not pending:
+                break
+            chunk, future = pending.popleft()
+            computed = iter(future.result() if future else [])
+            for _, key, cached in chunk:
+                if cached is not None:
+                    yield key, cached, True
+                else:
+                    yield key, next(computed), False
+
+
+def main(workers: int = 1, chunk_size: int = 8, use_cache: bool = False,
+         cache_dir=None, cache_max_bytes: int = DEFAULT_MAX_BYTES,
+         predicate_filter: PredicateFilter = None, output_format: str = 'json',
+         pddl_shard_size: int = None, extra_outputs=(),
+         input_path=INPUT_FILE_PATH, output_dir=OUTPUT_DIR):
+    # Setup output directory
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Setup logging
+    logging.basicConfig(
+        filename=output_dir/LOG_FILE_PATH.name,
+        filemode='w',
+        level=logging.INFO,
+        format='%(message)s'
+    )
+
+    strips_model = []
+
+    # The themrole hierarchy is loaded once and shared by all stages
+    hierarchy = load_hierarchy(TREE_PATH)
+
+    # Activity and temporal predicates left out of the action models
+    predicate_filter = predicate_filter or PredicateFilter.from_profile('default')
+
+    # Every stage runs through the pipeline, the per-class stages are cached and run in workers below
+    pipeline = Pipeline(hierarchy, predicate_filter, workers=workers)
+
+    # Cached classes are only recomputed when the class or any input changed
+    cache = None
+    if use_cache:
+        cache = ExtractionCache(
+            cache_dir or output_dir/CACHE_DIR.name,
+            [TREE_PATH],
+            code_version=get_code_version([__file__]),
+            max_bytes=cache_max_bytes,
+            extra_context=predicate_filter.fingerprint())
+
+    # Entries are read lazily, one class at a time
+    verbnet_entries = pipeline.load(input_path)
+    items = lookup_cache(verbnet_entries, cache)
+
+    # Classes are independent of each other until dedup
+    if workers > 1:
+        results = extract_parallel(items, pipeline, workers, chunk_size)
+    else:
+        results = extract_serial(items, pipeline)
+
+    # Unfiltered action models and example texts are written as classes are extracted
+    with JSONArrayWriter(output_dir/UNFILTERED_STRIPS_PATH.name, output_format, default=to_json) as strips_writer, \
+            JSONArrayWriter(output_dir/EXAMPLE_TEXT_PATH.name, output_format) as examples_writer:
+        for key, result, hit in results:
+            stages = result.pop('stages', None)
+            if cache is not None and not hit:
+                cache.put(key, result)
+            metrics.merge(result.get('counters'), None if hit else stages)
+            for message in result['messages']:
+                logging.info(message)
+            sys.stdout.write(result['printed'])
+            if result['strips_data'] is None:
+                continue
+            strips_model.append(result['strips_data'])
+            with metrics.stage('write'):
+                strips_writer.write(result['strips_data'])
+                examples_writer.write_all(result['examples'])
+
+    if cache is not None:
+        evicted = cache.evict()
+        print(f"Extraction cache: {cache.hits} hits, {cache.misses} misses, {evicted} evicted")
+        metrics.count('cache_hits', cache.hits)
+        metrics.count('cache_misses', cache.misses)
+
+    # Remove duplicated action models with same arguments, preconditions and effects
+    deduped_strips_model = pipeline.deduplicate(strips_model)
+
+    # Format the output into pddl like syntax
+    pddl_model = pipeline.format(deduped_strips_model)
+
+    # Precondition-effect links between the filtered models, built once for the whole domain
+    if 'link-graph' in extra_outputs:
+        with metrics.stage('links'):
+            link_graph = LinkGraph.from_action_models(deduped_strips_model, hierarchy)
+    
+    # Write the output data to json file
+    with metrics.stage('write'):
+        with JSONArrayWriter(output_dir/FILTERED_STRIPS_PATH.name, output_format) as writer:
+            writer.write_all(deduped_strips_model)
+
+        with JSONArrayWriter(output_dir/PDDL_FILE_PATH.name, output_format) as writer:
+            writer.write_all(pddl_model)
+
+        # PDDL domain with one action per frame, ready for planners
+        if 'domain' in extra_outputs:
+            write_pddl_domain(deduped_strips_model, output_dir/PDDL_DOMAIN_PATH.name, hierarchy,
+                              shard_size=pddl_shard_size)
+
+        # Binary store of the filtered models, read lazily with vn2am.store.ActionModelStore
+        if 'store' in extra_outputs:
+            write_action_model_store(deduped_strips_model, output_dir/ACTION_MODEL_STORE_PATH.name)
+
+        # Link graph as CSR arrays, loaded with vn2am.graph.LinkGraph.load
+        if 'link-graph' in extra_outputs:
+            link_graph.save(output_dir/LINK_GRAPH_PATH.name)
+
+    if metrics.enabled:
+        metrics.write(output_dir/METRICS_PATH.name)
+
+
+def load_batch_configs(path, output_dir=OUTPUT_DIR) -> list:
+    """
+    Reads a JSON list of batch configurations. Each one has a unique name and
+    optionally filter_profile, activity_predicates, temporal_predicates,
+    hierarchy, merge_subclasses (default true) and output_dir (default
+    <output_dir>/batch/<name>). Paths are relative to the configuration file.
+    """
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        configs = json.load(f)
+
+    loaded = []
+    names = set()
+    for config in configs:
+        unknown = sorted(set(config) - set(BATCH_KEYS))
+        if unknown:
+            raise ValueError(f"Unknown batch configuration keys {unknown}, expected {list(BATCH_KEYS)}")
+        name = config.get('name')
+        if not name or name in names:
+            raise ValueError(f"Batch configurations need unique names, got '{name}'")
+        names.add(name)
+
+        def resolve(key):
+            return path.parent/config[key] if config.get(key) else None
+
+        loaded.append({
+            'name': name,
+            # Unknown profiles and missing predicate files fail before any work starts
+            'predicate_filter': PredicateFilter.from_profile(
+                config.get('filter_profile', 'default'),
+                resolve('activity_predicates'), resolve('temporal_predicates')),
+            'hierarchy': resolve('hierarchy') or TREE_PATH,
+            'merge_subclasses': config.get('merge_subclasses', True),
+            'output_dir': resolve('output_dir') or Path(output_dir)/BATCH_OUTPUT_DIR.name/name,
+        })
+    return loaded
+
+
+def parse_corpus(input_path=INPUT_FILE_PATH, pipeline: Pipeline = None) -> list:
+    """
+    Parses every class once, as (entry with its class_id, analysis of each frame).
+    The analyses are made by Pipeline.parse_class, without themroles or activity
+    predicates, which depend on the configuration.
+    """
+    pipeline = pipeline or Pipeline()
+    corpus = []
+    for entry in pipeline.load(input_path):
+        corpus.append(({'class_id': entry.get('class_id', 'null')}, pipeline.parse_class(entry)))
+    return corpus
+
+
+# Parsed corpus of the batch, set once in each worker
+batch_corpus = None
+
+
+def set_batch_corpus(corpus: list):
+    global batch_corpus
+    batch_corpus = corpus
+
+
+def run_configuration(config: dict, output_format: str = 'json') -> dict:
+    """
+    Runs the stages that depend on a batch configuration (condition extraction,
+    dedup and PDDL formatting) on the shared corpus and writes the outputs
+    of the configuration to its own directory
+    """
+    hierarchy = load_hierarchy(config['hierarchy'])
+    predicate_filter = config['predicate_filter']
+    output_dir = Path(config['output_dir'])
+    output_dir.mkdir(parents=True, exist_ok=True)
+    pipeline = Pipeline(hierarchy, predicate_filter, config['merge_subclasses'])
+    strips_model = []
+    printed = []
+
+    with metrics.capture() as captured:
+        with open(output_dir/LOG_FILE_PATH.name, 'w', encoding='utf-8') as log_file, \
+                JSONArrayWriter(output_dir/UNFILTERED_STRIPS_PATH.name, output_format,
+                                default=to_json) as strips_writer, \
+                JSONArrayWriter(output_dir/EXAMPLE_TEXT_PATH.name, output_format) as examples_writer:
+            for entry, analyses in batch_corpus:
+                result = extract_class_output(entry, pipeline, analyses)
+                metrics.merge(result['counters'], result.get('stages'))
+                for message in result['messages']:
+                    log_file.write(message + '\n')
+                printed.append(result['printed'])
+                if result['strips_data'] is None:
+                    continue
+                strips_model.append(result['strips_data'])
+                with metrics.stage('write'):
+                    strips_writer.write(result['strips_data'])
+                    examples_writer.write_all(result['examples'])
+
+        deduped_strips_model = pipeline.deduplicate(strips_model)
+        pddl_model = pipeline.format(deduped_strips_model)
+        with metrics.stage('write'):
+            with JSONArrayWriter(output_dir/FILTERED_STRIPS_PATH.name, output_format) as writer:
+                writer.write_all(deduped_strips_model)
+            with JSONArrayWriter(output_dir/PDDL_FILE_PATH.name, output_format) as writer:
+                writer.write_all(pddl_model)
+
+    if captured.enabled:
+        captured.write(output_dir/METRICS_PATH.name)
+    return {
+        'name': config['name'],
+        'output_dir': output_dir,
+        'printed': ''.join(printed),
+        'counters': captured.counters,
+        'action_models': len(pddl_model),
+    }
+
+
+def run_batch(configs: list, workers: int = 1, output_format: str = 'json',
+              input_path=INPUT_FILE_PATH) -> list:
+    """
+    Parses the corpus once and runs every configuration on it,
+    configurations run in parallel with workers > 1
+    """
+    corpus = parse_corpus(input_path)
+    if workers > 1 and len(configs) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Each worker receives the parsed corpus once, not once per configuration
+        with ProcessPoolExecutor(max_workers=min(workers, len(configs)),
+                                 initializer=set_batch_corpus, initargs=(corpus,)) as executor:
+            results = list(executor.map(run_configuration, configs, [output_format] * len(configs)))
+    else:
+        set_batch_corpus(corpus)
+        results = [run_configuration(config, output_format) for config in configs]
+
+    for result in results:
+        sys.stdout.write(result['printed'])
+        print(f"{result['name']}: {result['action_models']} action models, "
+              f"{result['counters'].get('duplicates', 0)} duplicates, written to {result['output_dir']}")
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Extract STRIPS and PDDL action models from VerbNet 3.4")
+    parser.add_argument(
+        '--input', type=Path, default=INPUT_FILE_PATH,
+        help=f"VerbNet 3.4 JSON file (default: {INPUT_FILE_PATH})")
+    parser.add_argument(
+        '--output-dir', type=Path, default=OUTPUT_DIR,
+        help=f"directory of the outputs (default: {OUTPUT_DIR})")
+    parser.add_argument(
+        '--workers', type=int, default=1,
+        help="number of processes used to extract classes (default: 1)")
+    parser.add_argument(
+        '--chunk-size', type=int, default=8,
+        help="number of classes sent to a worker at once (default: 8)")
+    parser.add_argument(
+        '--cache', action='store_true',
+        help="reuse the classes extracted by earlier runs from .cache in the output directory")
+    parser.add_argument(
+        '--cache-size-mb', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="size limit of the extraction cache in MB (default: 512)")
+    parser.add_argument(
+        '--filter-profile', choices=sorted(FILTER_PROFILES), default='default',
+        help="named set of filtered predicates (default: default)")
+    parser.add_argument(
+        '--activity-predicates', type=Path,
+        help="file of activity predicates, replaces the one of the filter profile")
+    parser.add_argument(
+        '--temporal-predicates', type=Path,
+        help="file of temporal predicates, replaces the one of the filter profile")
+    parser.add_argument(
+        '--output-format', choices=OUTPUT_FORMATS, default='json',
+        help="indented JSON, compact JSON or JSON Lines (.jsonl) outputs (default: json)")
+    parser.add_argument(
+        '--extra-outputs', nargs='+', choices=EXTRA_OUTPUTS, default=[],
+        help="also write the PDDL domain, the binary action model store and/or the link graph")
+    parser.add_argument(
+        '--pddl-shard-size', type=int,
+        help="split the PDDL domain of --extra-outputs domain into files of at most this many actions")
+    parser.add_argument(
+        '--batch', type=Path,
+        help="JSON list of configurations run on one parse of the corpus, "
+             "each one writes to its own directory (ignores the filter and cache options)")
+    parser.add_argument(
+        '--serve', action='store_true',
+        help="keep the corpus in memory and convert classes on demand over HTTP "
+             "(POST /extract, GET /metrics)")
+    parser.add_argument(
+        '--host', default='127.0.0.1',
+        help="address of --serve (default: 127.0.0.1)")
+    parser.add_argument(
+        '--port', type=int,
+        help="port of --serve (default: 8765)")
+    parser.add_argument(
+        '--socket', type=Path,
+        help="serve on this Unix socket instead of a TCP port")
+    parser.add_argument(
+        '--profile', action='store_true',
+        help=f"write stage timings and counters to metrics.json in the output directory (or set {PROFILE_ENV}=1)")
+    parser.add_argument(
+        '--profile-dump', type=Path,
+        help="profile the whole run and write the profile to this file")
+    parser.add_argument(
+        '--profiler', choices=['cprofile', 'pyinstrument'], default='cprofile',
+        help="profiler of --profile-dump, pyinstrument writes an HTML report (default: cprofile)")
+    return parser.parse_args(argv)
+
+
+def run_profiled(run, dump_path: Path, profiler: str = 'cprofile'):
+    """
+    Runs the pipeline under a profiler and writes its report to dump_path
+    """
+    if profiler == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise SystemExit("pyinstrument is not installed, use --profiler cprofile")
+        profile = Profiler()
+        profile.start()
+        try:
+            run()
+        finally:
+            profile.stop()
+            dump_path.write_text(profile.output_html(), encoding='utf-8')
+    else:
+        import cProfile
+
+        profile = cProfile.Profile()
+        try:
+            profile.runcall(run)
+        finally:
+            profile.dump_stats(dump_path)
+
+
+def run_service(predicate_filter: PredicateFilter, host: str, port: int = None, socket_path=None,
+                input_path=INPUT_FILE_PATH):
+    """
+    Runs the extraction service until interrupted
+    """
+    # The server modules are only imported when serving
+    import asyncio
+    from vn2am.service import ExtractionService, serve, DEFAULT_PORT
+
+    service = ExtractionService.from_file(input_path, Pipeline(load_hierarchy(TREE_PATH), predicate_filter))
+    try:
+        asyncio.run(serve(service, host, port or DEFAULT_PORT, socket_path))
+    except KeyboardInterrupt:
+        pass
+
+
+def run_cli(argv=None):
+    """
+    Entry point of the vn2am command and of src/main.py
+    """
+    args = parse_args(argv)
+    predicate_filter = PredicateFilter.from_profile(
+        args.filter_profile, args.activity_predicates, args.temporal_predicates)
+    if args.profile:
+        metrics.enable()
+
+    def run():
+        if args.serve:
+            run_service(predicate_filter, args.host, args.port, args.socket, args.input)
+            return
+        if args.batch:
+            run_batch(load_batch_configs(args.batch, args.output_dir), workers=args.workers,
+                      output_format=args.output_format, input_path=args.input)
+            return
+        main(workers=args.workers, chunk_size=args.chunk_size, use_cache=args.cache,
+             cache_max_bytes=args.cache_size_mb * 1024 * 1024,
+             predicate_filter=predicate_filter, output_format=args.output_format,
+             pddl_shard_size=args.pddl_shard_size, extra_outputs=args.extra_outputs,
+             input_path=args.input, output_dir=args.output_dir)
+
+    if args.profile_dump:
+        run_profiled(run, args.profile_dump, args.profiler)
+    else:
+        run()
+
+
+if __name__ == "__main__":
+    run_cli()
@@ -1,39 +1,161 @@
 from vn2am.parser import get_semantic_args_without_event
+from vn2am.metrics import metrics
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
 from pathlib import Path
 
-src_dir = Path(__file__).parent
-activity_predicates_path = src_dir.parent/"data"/"activity_predicates.txt"
-temperoal_predicates_path = src_dir.parent/"data"/"temporal_predicates.txt"
+# Package data, installed next to the modules
+data_dir = Path(__file__).parent/"data"
+activity_predicates_path = data_dir/"activity_predicates.txt"
+temperoal_predicates_path = data_dir/"temporal_predicates.txt"
+
+# Writes the converter warnings, each thread or task can collect its own with collect_warnings
+_warning_writer = ContextVar('warning_writer', default=print)
+
+
+@contextmanager
+def collect_warnings():
+    """
+    Collects the converter warnings of the calls made in the block, in the current
+    thread or task only, instead of printing them. Yields the list of warnings.
+    """
+    warnings = []
+    token = _warning_writer.set(warnings.append)
+    try:
+        yield warnings
+    finally:
+        _warning_writer.reset(token)
+
+
+def warn(message: str):
+    _warning_writer.get()(message)
+
 
 def load_predicate_file(file_path: str) -> list:
     with open(file_path, 'r', encoding='utf-8') as f:
         return [line.strip() for line in f if line.strip()]
 
-ACTIVITY_PREDICATES = load_predicate_file(activity_predicates_path)
-TEMPEROAL_PREDICATES = load_predicate_file(temperoal_predicates_path)
+# Named filter profiles: (activity predicate file, temporal predicate file),
+# None means no predicate of that kind is filtered
+FILTER_PROFILES = {
+    'default': (activity_predicates_path, temperoal_predicates_path),
+    'activity-only': (activity_predicates_path, None),
+}
 
 
-def is_activity_predicate(predicate):
+class PredicateFilter:
+    """
+    Classifies predicates as activity or temporal predicates with frozenset
+    lookups. The lowercased form of each predicate name is cached.
+    """
+    def __init__(self, activity_predicates, temporal_predicates):
+        self.activity_predicates = frozenset(activity_predicates)
+        self.temporal_predicates = frozenset(temporal_predicates)
+        self.filtered_predicates = self.activity_predicates | self.temporal_predicates
+        self._lowered = {}
+
+    @classmethod
+    def from_files(cls, activity_path=activity_predicates_path, temporal_path=temperoal_predicates_path):
+        activity = load_predicate_file(activity_path) if activity_path else []
+        temporal = load_predicate_file(temporal_path) if temporal_path else []
+        return cls(activity, temporal)
+
+    @classmethod
+    def from_profile(cls, name: str = 'default', activity_path=None, temporal_path=None):
+        """
+        Builds the filter of a named profile, a given file replaces the file of the profile
+        """
+        if name not in FILTER_PROFILES:
+            raise ValueError(
+                f"Unknown filter profile '{name}', expected one of {sorted(FILTER_PROFILES)}")
+        profile_activity, profile_temporal = FILTER_PROFILES[name]
+        return cls.from_files(activity_path or profile_activity, temporal_path or profile_temporal)
+
+    def lower(self, predicate: str) -> str:
+        lowered = self._lowered.get(predicate)
+        if lowered is None:
+            lowered = self._lowered[predicate] = predicate.lower()
+        return lowered
+
+    def is_activity_predicate(self, predicate) -> bool:
+        return self.lower(predicate) in self.activity_predicates
+
+    def is_predicate_filtered(self, predicate) -> bool:
+        return self.lower(predicate) in self.filtered_predicates
+
+    def fingerprint(self) -> str:
+        """
+        Digest of the filtered predicates, for cache keys
+        """
+        import hashlib
+
+        digest = hashlib.sha256()
+        for predicates in (self.activity_predicates, self.temporal_predicates):
+            digest.update('\n'.join(sorted(predicates)).encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def __getstate__(self):
+        # The lowercase cache is rebuilt in worker processes
+        return (self.activity_predicates, self.temporal_predicates)
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+
+@lru_cache(maxsize=None)
+def get_default_predicates() -> tuple:
+    """
+    Lists of the default activity and temporal predicate files, read on first use
+    """
+    return load_predicate_file(activity_predicates_path), load_predicate_file(temperoal_predicates_path)
+
+
+@lru_cache(maxsize=None)
+def get_default_filter() -> PredicateFilter:
+    return PredicateFilter(*get_default_predicates())
+
+
+# Names that used to be loaded at import, now read on first access
+_LAZY_ATTRIBUTES = {
+    'ACTIVITY_PREDICATES': lambda: get_default_predicates()[0],
+    'TEMPEROAL_PREDICATES': lambda: get_default_predicates()[1],
+    'DEFAULT_FILTER': get_default_filter,
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def is_activity_predicate(predicate, predicate_filter: PredicateFilter = None):
     """
     return true if the predicate is a activity predicate.
     """
-    return predicate.lower() in ACTIVITY_PREDICATES
+    return (predicate_filter or get_default_filter()).is_activity_predicate(predicate)
 
 
-def is_predicate_filtered(predicate):
+def is_predicate_filtered(predicate, predicate_filter: PredicateFilter = None):
     """
     return true if the predicate is either a activity predicate or a temperoal predicate
     """
-    return predicate.lower() in ACTIVITY_PREDICATES or predicate.lower() in TEMPEROAL_PREDICATES
+    return (predicate_filter or get_default_filter()).is_predicate_filtered(predicate)
 
 
-def get_all_condition_with_activity(semantic_list: list, event_index: dict, activity_event_tag: str) -> tuple:
+def get_all_condition_with_activity(semantic_list: list, event_index: dict, activity_event_tag: str,
+                                    predicate_filter: PredicateFilter = None) -> tuple:
     """
     Extract preconditions and postconditions with a activity predicate event tag
     """
     preconditions = []
-    postconditions = []
-    appeared_items = {}
+    # {position in semantic_list: semantic} in insertion order, so a contradicted
+    # postcondition is moved to the preconditions without scanning the list
+    postconditions = {}
+    appeared_items = {}  # {key: (position, first semantic with this key)}
+    filtered = 0
     flag = False
     is_precondition_empty = True
     activity_event_index = event_index.get(activity_event_tag, None)
@@ -43,20 +165,22 @@ def get_all_condition_with_activity(semantic_list: list, event_index: dict, acti
             f"activity event tag '{activity_event_tag}' not found in event index.")
     # For all predicate with event tags before the activity event,
     # add them to preconditions.
-    for arg_event, predicate, args, bool_value in semantic_list:
+    for position, semantic in enumerate(semantic_list):
+        arg_event, predicate, args, bool_value = semantic
         if len(arg_event) > 1:
             # predicate without event tags or more than 1 event tag, skip it
             continue
 
-        if is_predicate_filtered(predicate):
+        if is_predicate_filtered(predicate, predicate_filter):
+            filtered += 1
             continue
 
         if not arg_event:
-            preconditions.append((arg_event, predicate, args, bool_value))
+            preconditions.append(semantic)
             continue
 
         if arg_event[0] == 'E':
-            preconditions.append((arg_event, predicate, args, bool_value))
+            preconditions.append(semantic)
             continue
 
         arg_event_index = event_index.get(arg_event[0], None)
@@ -65,74 +189,79 @@ def get_all_condition_with_activity(semantic_list: list, event_index: dict, acti
             continue
 
         if arg_event_index < activity_event_index:
-            preconditions.append((arg_event, predicate, args, bool_value))
+            preconditions.append(semantic)
             is_precondition_empty = False
         elif arg_event_index >= activity_event_index:
             # Tracking the same preidcate with different bool_value in postconditions
             key_args = get_semantic_args_without_event(args)
             key = (predicate, tuple(key_args))
-            
             if key in appeared_items:
-                previous_item = appeared_items[key]
-                previous_bool_value = previous_item[-1]
-                if bool_value != previous_bool_value:
-                    if previous_item in postconditions:
-                        postconditions.remove(previous_item)
-                        preconditions.append(previous_item)
+                previous_position, previous_item = appeared_items[key]
+                # If the same predicate and args appear again with a different bool_value, handle accordingly
+                if bool_value != previous_item[-1]:
+                    # The first appearance stays in postconditions until it is moved
+                    if previous_position in postconditions:
+                        preconditions.append(postconditions.pop(previous_position))
                         flag = True
-                    postconditions.append(
-                        (arg_event, predicate, args, bool_value))
+                    postconditions[position] = semantic
             else:
                 # Track the first appearance and add to postconditions
-                appeared_items[key] = (arg_event, predicate, args, bool_value)
-                postconditions.append((arg_event, predicate, args, bool_value))
+                appeared_items[key] = (position, semantic)
+                postconditions[position] = semantic
 
-    return preconditions, postconditions, flag, is_precondition_empty
+    if filtered:
+        metrics.count('filtered_predicates', filtered)
+    return preconditions, list(postconditions.values()), flag, is_precondition_empty
 
 
-def get_all_condition(semantic_list: list) -> tuple:
+def get_all_condition(semantic_list: list, predicate_filter: PredicateFilter = None) -> tuple:
     """
     Tracks all appeared predicates, args, and bool_values.
     Initially adds all items to postconditions and keeps track of appeared ones.
     When a new one appears with a different bool_value, moves the previous one from postconditions to preconditions.
     """
     preconditions = []
-    postconditions = []
-    appeared_items = {}
+    # {position in semantic_list: semantic} in insertion order, so a contradicted
+    # postcondition is moved to the preconditions without scanning the list
+    postconditions = {}
+    appeared_items = {}  # {key: (position, first semantic with this key)}
+    filtered = 0
     flag = False
-    for arg_event, predicate, args, bool_value in semantic_list:
+    for position, semantic in enumerate(semantic_list):
+        arg_event, predicate, args, bool_value = semantic
         if len(arg_event) > 1: # predicate involves multiple event tags
             continue
         
         if not arg_event or arg_event[0] == 'E': 
             # predicate do not have event tag or with tag 'E' (always true)
-            preconditions.append((arg_event, predicate, args, bool_value))
+            preconditions.append(semantic)
             continue
 
-        if is_predicate_filtered(predicate):
+        if is_predicate_filtered(predicate, predicate_filter):
+            filtered += 1
             continue
         
         # Tracking the same preidcate with different bool_value
         # Use predicate and non-event args as a unique key
         key_args = get_semantic_args_without_event(args)
         key = (predicate, tuple(key_args))
-
         if key in appeared_items:
-            previous_item = appeared_items[key]
-            previous_bool_value = previous_item[-1]
+            previous_position, previous_item = appeared_items[key]
             # If the same predicate and args appear again with a different bool_value, handle accordingly
-            if bool_value != previous_bool_value:
-                if previous_item in postconditions:
-                    postconditions.remove(previous_item)
-                    preconditions.append(previous_item)
+            if bool_value != previous_item[-1]:
+                # The first appearance stays in postconditions until it is moved
+                if previous_position in postconditions:
+                    preconditions.append(postconditions.pop(previous_position))
                     flag = True
-                postconditions.append((arg_event, predicate, args, bool_value))
+                postconditions[position] = semantic
         else:
             # Track the first appearance and add to postconditions
-            appeared_items[key] = (arg_event, predicate, args, bool_value)
-            postconditions.append((arg_event, predicate, args, bool_value))
+            appeared_items[key] = (position, semantic)
+            postconditions[position] = semantic
 
-    return preconditions, postconditions, flag
+    if filtered:
+        metrics.count('filtered_predicates', filtered)
+    return preconditions, list(postconditions.values()), flag
 
 
 def is_single_event(semantic_list: list) -> list:
@@ -148,39 +277,53 @@ def is_single_event(semantic_list: list) -> list:
     return False
 
 
-def get_activity_event_tag(semantic_list: list) -> str:
+def get_activity_event_tag(semantic_list: list, predicate_filter: PredicateFilter = None) -> str:
     """
     find the event tag for first activty predicate
     """
     event_tag = None
     for arg_event, predicate, _, _ in semantic_list:
-        if (is_activity_predicate(predicate)) and len(arg_event) == 1:
+        if (is_activity_predicate(predicate, predicate_filter)) and len(arg_event) == 1:
             event_tag = arg_event[0]
             break
     return event_tag
 
 
-def get_pre_post_conditions(semantic_list: list, event_index: dict) -> tuple:
+def get_pre_post_conditions(semantic_list: list, event_index: dict,
+                            predicate_filter: PredicateFilter = None) -> tuple:
     """
     Extracts preconditions and postconditions from a list of semantics.
     """
-    activity_event_tag = get_activity_event_tag(semantic_list)
+    activity_event_tag = get_activity_event_tag(semantic_list, predicate_filter)
+    return split_pre_post_conditions(
+        semantic_list, event_index, activity_event_tag, predicate_filter)
+
+
+def split_pre_post_conditions(semantic_list: list, event_index: dict, activity_event_tag: str,
+                              predicate_filter: PredicateFilter = None) -> tuple:
+    """
+    Extracts preconditions and postconditions from a list of semantics,
+    with the activity event tag already found (e.g. by parser.analyze_frame).
+    """
     is_single = len(event_index) == 1
 
     if is_single or activity_event_tag is None:
         preconditions, postconditions, flag = get_all_condition(
-            semantic_list)
+            semantic_list, predicate_filter)
         is_precondition_empty = True
     else:
         preconditions, postconditions, flag, precondition_flag = get_all_condition_with_activity(
-            semantic_list, event_index, activity_event_tag)
+            semantic_list, event_index, activity_event_tag, predicate_filter)
         is_precondition_empty = precondition_flag
 
+    if flag:
+        metrics.count('contradictions')
+
     # semantic list without activity predicate always has a empty preconditions
     # here checks when whether contradiction happens if there exists other 
     # non-activity preconditions
     if not is_precondition_empty and flag:
-        print("Warning: Precondition is not empty, but there are contradictions in postconditions.")
+        warn("Warning: Precondition is not empty, but there are contradictions in postconditions.")
 
     return preconditions, postconditions
 
@@ -211,7 +354,7 @@ def format_cond(conditions):
     if not conditions:
         return []
     for cond in conditions:
-        sign, keyword, args  = cond
+        sign, keyword, args  = cond[:3]
         if sign == "not":
             if args[0] == 'Event':
                 output = ["not", f"{keyword}", args[1:]]
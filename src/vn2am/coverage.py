@@ -0,0 +1,143 @@
+import numpy as np
+from vn2am.hierarchy import ThemroleHierarchy, load_hierarchy
+from vn2am.links import condition_key
+from vn2am.utils import compare_predicate_args
+
+# Histogram buckets of the link percentages plotted in the analysis notebooks
+PERCENTAGE_BINS = [0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1, 1.1]
+
+
+def condition_counts(am_data: list) -> tuple:
+    """
+    Number of preconditions and postconditions of every frame, as two arrays
+    """
+    frames = [frame for entry in am_data for frame in entry.get('frames', [])]
+    pre_counts = np.fromiter((len(frame.get('preconditions', [])) for frame in frames),
+                             dtype=np.int64, count=len(frames))
+    post_counts = np.fromiter((len(frame.get('postconditions', [])) for frame in frames),
+                              dtype=np.int64, count=len(frames))
+    return pre_counts, post_counts
+
+
+def encode_conditions(am_data: list, name: str, signatures: dict = None, key=None) -> tuple:
+    """
+    Integer coded conditions: the distinct condition signatures
+    (bool, predicate, args) and a frames x signatures boolean matrix.
+    With key, conditions of a frame with the same key count once, the last one is kept.
+    """
+    signatures = {} if signatures is None else signatures
+    rows = []
+    for entry in am_data:
+        for frame in entry.get('frames', []):
+            row = {}
+            for cond in frame.get(name, []):
+                signature = (cond[0], cond[1], tuple(cond[2]))
+                # Without key, every signature is kept
+                row[key(signature) if key else signature] = signatures.setdefault(signature, len(signatures))
+            rows.append(list(row.values()))
+    matrix = np.zeros((len(rows), len(signatures)), dtype=bool)
+    frame_ids = np.repeat(np.arange(len(rows)), [len(row) for row in rows])
+    matrix[frame_ids, np.fromiter((i for row in rows for i in row), dtype=np.int64, count=len(frame_ids))] = True
+    return list(signatures), matrix
+
+
+def get_postcondition_name(signature: tuple) -> tuple:
+    """
+    Key of a postcondition in the outgoing link dicts, which leave out the
+    'not' of negated postconditions
+    """
+    return signature[1], signature[2]
+
+
+def match_signatures(signatures: list, others: list, value_to_node, themroles: frozenset) -> np.ndarray:
+    """
+    signatures x others boolean matrix of the conditions that link,
+    the arguments are only compared for signatures with the same bool, predicate and arity
+    """
+    candidates = {}
+    for j, other in enumerate(others):
+        candidates.setdefault(condition_key(other), []).append(j)
+    matches = np.zeros((len(signatures), len(others)), dtype=bool)
+    for i, signature in enumerate(signatures):
+        for j in candidates.get(condition_key(signature), []):
+            matches[i, j] = compare_predicate_args(signature[2], others[j][2], value_to_node, themroles)
+    return matches
+
+
+class LinkCoverage:
+    """
+    Link coverage of the filtered action models, with the same links as
+    links.LinkIndex. Frames are encoded as frames x condition signature
+    matrices, the arguments of each pair of signatures are compared once,
+    and the counts are matrix operations over the frames.
+    """
+    def __init__(self, am_data: list, hierarchy: ThemroleHierarchy = None):
+        hierarchy = hierarchy or load_hierarchy()
+        self.frame_names = [f"{entry.get('class_id', 'null')}-{i}"
+                            for entry in am_data for i, _ in enumerate(entry.get('frames', []))]
+        self.pre_counts, self.post_counts = condition_counts(am_data)
+        self.pre_signatures, self.pre = encode_conditions(am_data, 'preconditions')
+        post_signatures = {}
+        self.post_signatures, self.post = encode_conditions(am_data, 'postconditions', post_signatures)
+        # link_post_to_pre keys its result by a name without the sign, so of the
+        # postconditions of a frame with the same predicate and arguments only the last counts
+        _, self.named_post = encode_conditions(
+            am_data, 'postconditions', post_signatures, get_postcondition_name)
+        # pre_to_post[p, s]: precondition p links to postcondition s, and the reverse
+        self.pre_to_post = match_signatures(
+            self.pre_signatures, self.post_signatures, hierarchy.value_to_node, hierarchy.themroles)
+        self.post_to_pre = match_signatures(
+            self.post_signatures, self.pre_signatures, hierarchy.value_to_node, hierarchy.themroles)
+
+        # Every signature comes from a frame, so a signature with a match has a link.
+        # Conditions repeated in a frame count once, like the keys of the link dicts.
+        self.incoming_counts = self.pre.astype(np.int64) @ self.pre_to_post.any(axis=1)
+        self.outgoing_counts = self.named_post.astype(np.int64) @ self.post_to_pre.any(axis=1)
+
+    def __len__(self) -> int:
+        return len(self.frame_names)
+
+    def adjacency(self) -> np.ndarray:
+        """
+        frames x frames boolean matrix, [g, f] is True when an effect of frame g
+        links to a precondition of frame f
+        """
+        return (self.post.astype(np.int64) @ self.post_to_pre.astype(np.int64)
+                @ self.pre.T.astype(np.int64)) > 0
+
+    def incoming_percentages(self) -> np.ndarray:
+        """
+        Linked preconditions as a fraction of the preconditions, for frames with preconditions
+        """
+        has_pre = self.pre_counts > 0
+        return self.incoming_counts[has_pre] / self.pre_counts[has_pre]
+
+    def outgoing_percentages(self) -> np.ndarray:
+        """
+        Linked postconditions as a fraction of the postconditions, for frames with postconditions
+        """
+        has_post = self.post_counts > 0
+        return self.outgoing_counts[has_post] / self.post_counts[has_post]
+
+    @staticmethod
+    def histogram(percentages: np.ndarray, bins: list = PERCENTAGE_BINS) -> tuple:
+        """
+        Counts of the percentages in each bucket, and the bucket edges
+        """
+        return np.histogram(percentages, bins=bins)
+
+    def summary(self) -> dict:
+        incoming, outgoing = self.incoming_counts, self.outgoing_counts
+        return {
+            'action_models': len(self),
+            'with_incoming_links': int((incoming > 0).sum()),
+            'with_outgoing_links': int((outgoing > 0).sum()),
+            'incoming_less_than_preconditions': int((incoming < self.pre_counts).sum()),
+            'outgoing_less_than_postconditions': int((outgoing < self.post_counts).sum()),
+            'without_incoming_links': int((incoming == 0).sum()),
+            'without_outgoing_links': int((outgoing == 0).sum()),
+            'with_both_links': int(((incoming > 0) & (outgoing > 0)).sum()),
+            'without_links': int(((incoming == 0) & (outgoing == 0)).sum()),
+            'perfectly_incoming_linked': int(((incoming == self.pre_counts) & (incoming > 0)).sum()),
+            'perfectly_outgoing_linked': int(((outgoing == self.post_counts) & (outgoing > 0)).sum()),
+        }
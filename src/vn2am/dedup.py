@@ -1,23 +1,21 @@
-import json
-import copy
-from pathlib import Path
+import hashlib
+from vn2am.hierarchy import ThemroleHierarchy, load_hierarchy, search_top_themrole, SEMANTIC_TREE_PATH
+from vn2am.metrics import metrics
 from vn2am.utils import get_argument_without_type, transform_hidden_arguments, formatted_predicate
 
 DEBUG = False
-src_dir = Path(__file__).parent.parent
-SEMANTIC_TREE_PATH = src_dir/'data'/'vn_semanticrole_hierarchy.json'
-
-with open(SEMANTIC_TREE_PATH, 'r') as f:
-    semantic_tree = json.load(f)
 
+# Duplicates found by the last dedup call
 dup_count = 0
 
-def merge_same_frame(frames: dict) -> tuple[int, list]:
+def merge_same_frame(frames: dict, hierarchy: ThemroleHierarchy = None) -> tuple[int, list]:
     """
-    Takes all frames (action models) in a class and filter duplicated models
+    Takes all frames (action models) in a class and filter duplicated models,
+    returns the number of duplicates and the unique frames
     """
     # A dict to store unique frames
     unique_frames = {}
+    group_dup_count = 0
     
     for frame in frames:
         # Extract all arguments in this frame, ignore ? marks
@@ -46,23 +44,14 @@ def merge_same_frame(frames: dict) -> tuple[int, list]:
             'postconditions': current_effects
         }
         
-        # Sort the arguments, preconditions, and postconditions
-        # for comparison
-        parameters_key = format_parameters_key(parameters_without_hidden_mark)
-        preconds_key = format_tuple_key(current_preconds)
-        effects_key = format_tuple_key(current_effects)
-
-        # Use a unique identifier for each frame to avoid duplicates
-        unique_identifier = (
-            parameters_key,
-            preconds_key,
-            effects_key
-        )
+        # Use a unique identifier for each frame to avoid duplicates,
+        # a digest of the sorted arguments, preconditions, and postconditions
+        unique_identifier = format_frame_key(
+            parameters_without_hidden_mark, current_preconds, current_effects, hierarchy)
 
         # Count duplicates for measurement
-        global dup_count
         if unique_identifier in unique_frames:
-            dup_count += 1
+            group_dup_count += 1
 
         if unique_identifier not in unique_frames:
             unique_frames[unique_identifier] = current_frame
@@ -72,7 +61,7 @@ def merge_same_frame(frames: dict) -> tuple[int, list]:
         if (DEBUG):
             print(f"Unique Frame: {frame}")
 
-    return extract_unique_frames(unique_frames)
+    return group_dup_count, extract_unique_frames(unique_frames)
 
 
 def extract_unique_frames(frame_dict):
@@ -93,56 +82,85 @@ def get_condition_texts(frame: dict, name: str) -> list:
     return condition_text
 
 
-def format_tuple_key(conditions: list[tuple]):
+def format_tuple_key(conditions: list[tuple], hierarchy: ThemroleHierarchy = None):
     """
     input condition format: bool_value, predicate_name, tuple(args_without_type)
     """
-    cond_key = copy.deepcopy(conditions)
-    for i, cond in enumerate(cond_key):
-        cond = list(cond)  # Convert tuple to list
-        cond[2] = [get_top_themrole(arg, semantic_tree) for arg in cond[2] if arg != "Event"]
-        cond[2] = sorted(cond[2], key=lambda x: str(x)) # Sort args to ensure consistency
-        cond[2] = tuple(cond[2])
-        cond_key[i] = tuple(cond)  # Update the original list with the modified tuple
-    return tuple(cond_key)
+    get_top = (hierarchy or load_hierarchy(SEMANTIC_TREE_PATH)).get_top_themrole
+    # Sort args to ensure consistency
+    return tuple(
+        (cond[0], cond[1], tuple(sorted(get_top(arg) for arg in cond[2] if arg != "Event")))
+        for cond in conditions)
 
 
-def format_parameters_key(arguments: list) -> list:
+def format_parameters_key(arguments: list, hierarchy: ThemroleHierarchy = None) -> list:
     """
     convert arguments into their top themrole and create a consistent parameters key
     """
-    arguments = sorted(arguments, key=lambda x: str(x))
-    arguments_key = []
-    for arg in arguments:
-        arg = get_top_themrole(arg, semantic_tree)
-        arguments_key.append(arg)
-    return tuple(arguments_key)
-
-
-def get_top_themrole(themrole, entry):
-    current_top_node = ""
-
-    # Search the themrole from the root of themrole tree to find its top parent
-    def dfs(themrole, entry, current_top_node):
-        if entry['value'] == 'Affector':
-            current_top_node = 'Affector'
-        elif entry['value'] == 'Undergoer':
-            current_top_node = 'Undergoer'
-        elif entry['value'] == 'Property':
-            current_top_node = 'Property'
-        elif entry['value'] == 'Place':
-            current_top_node = 'Place'
-        
-        if entry['value'].lower() == themrole:
-            return current_top_node
-        for child in entry.get('children', []):
-            result = dfs(themrole, child, current_top_node)
-            if result:
-                return result
-        return "Not-Exist"
-    
-    current_top_node = dfs(themrole, entry, "")
-    return current_top_node if current_top_node else themrole
+    get_top = (hierarchy or load_hierarchy(SEMANTIC_TREE_PATH)).get_top_themrole
+    return tuple(get_top(arg) for arg in sorted(arguments))
+
+
+# Separators of the canonical form hashed by format_frame_key
+_FIELD_SEP = b'\x1f'
+_ITEM_SEP = b'\x1e'
+_PART_SEP = b'\x1d'
+
+
+def format_frame_key(arguments: list, preconditions: list, postconditions: list,
+                     hierarchy: ThemroleHierarchy = None) -> bytes:
+    """
+    128-bit digest of the canonical form of a frame, equal for two frames exactly
+    when their format_parameters_key and format_tuple_key keys are equal.
+    The canonical form is hashed as it is built, without copying the conditions.
+    """
+    get_top = (hierarchy or load_hierarchy(SEMANTIC_TREE_PATH)).get_top_themrole
+    digest = hashlib.blake2b(digest_size=16)
+    for arg in sorted(arguments):
+        digest.update(get_top(arg).encode())
+        digest.update(_FIELD_SEP)
+    for conditions in (preconditions, postconditions):
+        digest.update(_PART_SEP)
+        for bool_value, predicate, args, *_ in conditions:
+            digest.update(bool_value.encode())
+            digest.update(_FIELD_SEP)
+            digest.update(predicate.encode())
+            for arg in sorted(get_top(arg) for arg in args if arg != "Event"):
+                digest.update(_FIELD_SEP)
+                digest.update(arg.encode())
+            digest.update(_ITEM_SEP)
+    return digest.digest()
+
+
+# Tree and bound top themrole lookup of the module hierarchy, set on first use
+_module_tree = None
+_module_get_top = None
+
+
+def _bind_module_hierarchy():
+    global _module_tree, _module_get_top
+    hierarchy = load_hierarchy(SEMANTIC_TREE_PATH)
+    _module_tree = hierarchy.tree
+    _module_get_top = hierarchy.get_top_themrole
+
+
+def get_top_themrole(themrole, entry=None):
+    """
+    Find the top category of a themrole in the themrole tree.
+    Lookups on the module tree are answered from the shared hierarchy index.
+    """
+    if _module_get_top is None:
+        _bind_module_hierarchy()
+    if entry is None or entry is _module_tree:
+        return _module_get_top(themrole)
+    return search_top_themrole(themrole, entry)
+
+
+def __getattr__(name):
+    # The module tree used to be loaded at import, it is now loaded on first access
+    if name == 'semantic_tree':
+        return load_hierarchy(SEMANTIC_TREE_PATH).tree
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def merge_subclass_frames(entries: list) -> dict:
@@ -177,7 +195,20 @@ def merge_subclass_frames(entries: list) -> dict:
     return merged_entries
 
 
-def dedup(data):  
+def merge_same_frame_groups(groups: list, hierarchy: ThemroleHierarchy = None) -> list:
+    """
+    Runs merge_same_frame on a chunk of verb groups in a worker
+    """
+    return [merge_same_frame(frames, hierarchy) for frames in groups]
+
+
+def dedup(data, hierarchy: ThemroleHierarchy = None, workers: int = 1, chunk_size: int = 16,
+          merge_subclasses: bool = True):
+    """
+    Removes duplicated frames in each class, subclasses are merged into their
+    parent class first unless merge_subclasses is False
+    """
+    global dup_count
     unique_entries = []
 
     # how many action models extracted including duplicates
@@ -189,21 +220,38 @@ def dedup(data):
             if len(postconditions) > 0:
                 raw_count += 1
     
-    merged_entires = merge_subclass_frames(data)
-
-    for entry in merged_entires:
-        frames = entry.get('frames', [])
+    merged_entires = merge_subclass_frames(data) if merge_subclasses else data
+    groups = [entry.get('frames', []) for entry in merged_entires]
+
+    # Verb groups are independent, each one counts its own duplicates
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        chunks = [groups[i:i + chunk_size] for i in range(0, len(groups), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = [result
+                       for chunk_results in executor.map(
+                           merge_same_frame_groups, chunks, [hierarchy] * len(chunks))
+                       for result in chunk_results]
+    else:
+        results = merge_same_frame_groups(groups, hierarchy)
+
+    total_dup_count = 0
+    for entry, (group_dup_count, unique_frames) in zip(merged_entires, results):
         class_id = entry.get('class_id', 'Unknown')
-        unique_frames = merge_same_frame(frames)
+        total_dup_count += group_dup_count
         current_class = {
             "class_id" : class_id,
             "frames"   : unique_frames
         }
         unique_entries.append(current_class)
+    dup_count = total_dup_count
+    metrics.count('duplicates', dup_count)
+    metrics.count('classes_merged', len(data) - len(merged_entires))
 
     # Test if the count of unique frames matches the raw count
     unique_frame_count = sum(len(entry.get('frames', [])) for entry in unique_entries)
     assert dup_count + unique_frame_count == raw_count, \
         f"Duplicate count {dup_count} + unique count {unique_frame_count} does not match total action models {raw_count}"
 
-    return unique_entries
\ No newline at end of file
+    return unique_entries
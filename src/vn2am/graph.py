@@ -0,0 +1,267 @@
+import struct
+import sys
+from array import array
+from pathlib import Path
+from vn2am.hierarchy import ThemroleHierarchy
+from vn2am.links import LinkIndex
+from vn2am.store import _to_little_endian
+
+# File layout, every section is an array of little-endian uint32:
+#   header      MAGIC, then the number of frames, edges and bytes of name data
+#   indptr      first edge of each frame (one more than the frames)
+#   indices     target frame of each edge, sorted per frame
+#   names       offsets of the frame names in the name data (one more than the frames)
+#   name data   utf-8 text of all frame names
+MAGIC = b'VN2AMLG1'
+_HEADER = struct.Struct('<8s3I')
+
+
+def _from_bytes(data: bytes) -> array:
+    values = array('I', data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def to_csr(edges: list) -> tuple:
+    """
+    CSR arrays (indptr, indices) of a list of target sets, one per frame
+    """
+    indptr = array('I', [0])
+    indices = array('I')
+    for targets in edges:
+        indices.extend(sorted(targets))
+        indptr.append(len(indices))
+    return indptr, indices
+
+
+def iter_bits(mask: int):
+    """
+    Positions of the set bits of mask, in increasing order
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class LinkGraph:
+    """
+    Precondition-effect link graph of the filtered action models.
+    Frame ids follow the order of the frames in the dedup output, there is an
+    edge g -> f when an effect of frame g links to a precondition of frame f,
+    the same links as links.LinkIndex. Edges are kept as CSR arrays.
+    """
+    def __init__(self, names: list, indptr: array, indices: array):
+        self.names = names
+        self.indptr = indptr
+        self.indices = indices
+        # Neighbor lookups are slices of this view, without copying the edges
+        self._indices_view = memoryview(indices)
+        self._name_index = None
+        self._reverse = None
+        self._reverse_view = None
+        self._masks = {False: None, True: None}
+
+    @classmethod
+    def from_action_models(cls, am_data: list, hierarchy: ThemroleHierarchy = None):
+        link_index = LinkIndex(am_data, hierarchy=hierarchy)
+        frames = [frame for entry in am_data for frame in entry.get('frames', [])]
+        names = [f"{entry.get('class_id', 'null')}-{i}"
+                 for entry in am_data for i, _ in enumerate(entry.get('frames', []))]
+        edges = [set() for _ in frames]
+        sources = {}
+        for frame_number, frame in enumerate(frames):
+            for precond in frame.get('preconditions', []):
+                cache_key = (precond[0], precond[1], tuple(precond[2]))
+                if cache_key not in sources:
+                    sources[cache_key] = [source for source, _ in link_index.find_linked_frames(
+                        precond, link_index.postconditions)]
+                for source in sources[cache_key]:
+                    edges[source].add(frame_number)
+        return cls(names, *to_csr(edges))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.indices)
+
+    def frame_id(self, frame) -> int:
+        """
+        Id of a frame given by id or by name ('{class_id}-{i}'), the name index is built on first use
+        """
+        if not isinstance(frame, str):
+            if not 0 <= frame < len(self.names):
+                raise IndexError(f"frame {frame} out of range")
+            return frame
+        if self._name_index is None:
+            self._name_index = {name: i for i, name in enumerate(self.names)}
+        return self._name_index[frame]
+
+    def successors(self, frame) -> memoryview:
+        """
+        Frames with a precondition linked to an effect of the frame,
+        as a read-only view of the CSR indices
+        """
+        i = self.frame_id(frame)
+        return self._indices_view[self.indptr[i]:self.indptr[i + 1]]
+
+    def reverse_csr(self) -> tuple:
+        """
+        CSR arrays of the reversed links, built on first use
+        """
+        if self._reverse is None:
+            edges = [[] for _ in range(len(self))]
+            for source in range(len(self)):
+                for target in self.indices[self.indptr[source]:self.indptr[source + 1]]:
+                    edges[target].append(source)
+            self._reverse = to_csr(edges)
+            self._reverse_view = memoryview(self._reverse[1])
+        return self._reverse
+
+    def predecessors(self, frame) -> memoryview:
+        """
+        Frames with an effect linked to a precondition of the frame,
+        as a read-only view of the reversed CSR indices
+        """
+        indptr, _ = self.reverse_csr()
+        i = self.frame_id(frame)
+        return self._reverse_view[indptr[i]:indptr[i + 1]]
+
+    def out_degree(self, frame) -> int:
+        i = self.frame_id(frame)
+        return self.indptr[i + 1] - self.indptr[i]
+
+    def in_degree(self, frame) -> int:
+        indptr, _ = self.reverse_csr()
+        i = self.frame_id(frame)
+        return indptr[i + 1] - indptr[i]
+
+    def link_masks(self, reverse: bool = False) -> list:
+        """
+        Linked frames of every frame as an int bitmask, built on first use
+        """
+        if self._masks[reverse] is None:
+            indptr, indices = self.reverse_csr() if reverse else (self.indptr, self.indices)
+            masks = []
+            for frame in range(len(self)):
+                mask = 0
+                for target in indices[indptr[frame]:indptr[frame + 1]]:
+                    mask |= 1 << target
+                masks.append(mask)
+            self._masks[reverse] = masks
+        return self._masks[reverse]
+
+    def reachable(self, sources, max_depth: int = None, reverse: bool = False) -> list:
+        """
+        Frames reachable from the sources (a frame or a list of frames) in at most
+        max_depth steps, by depth then by id. The sources are only included when
+        a path leads back to them. With reverse, follows the links backwards.
+        """
+        if isinstance(sources, (str, int)):
+            sources = [sources]
+        masks = self.link_masks(reverse)
+        # The frontier and the visited frames are bitmasks, so a step costs
+        # one OR per frame of the frontier instead of one set lookup per link
+        frontier = 0
+        for source in sources:
+            frontier |= 1 << self.frame_id(source)
+        visited = 0
+        order = []
+        depth = 0
+        while frontier and (max_depth is None or depth < max_depth):
+            reached = 0
+            for frame in iter_bits(frontier):
+                reached |= masks[frame]
+            frontier = reached & ~visited
+            visited |= frontier
+            order.extend(iter_bits(frontier))
+            depth += 1
+        return order
+
+    def has_path(self, source, target) -> bool:
+        return self.frame_id(target) in set(self.reachable(source))
+
+    def strongly_connected_components(self) -> list:
+        """
+        Strongly connected components as lists of frame ids, with Tarjan's algorithm.
+        A component comes after every component it links to.
+        """
+        index = [-1] * len(self)
+        lowlink = [0] * len(self)
+        on_stack = [False] * len(self)
+        stack = []
+        components = []
+        counter = 0
+
+        for root in range(len(self)):
+            if index[root] != -1:
+                continue
+            # Iterative DFS, each call frame is (frame, position of its next edge)
+            calls = [(root, self.indptr[root])]
+            index[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            while calls:
+                frame, edge = calls[-1]
+                if edge < self.indptr[frame + 1]:
+                    calls[-1] = (frame, edge + 1)
+                    target = self.indices[edge]
+                    if index[target] == -1:
+                        index[target] = lowlink[target] = counter
+                        counter += 1
+                        stack.append(target)
+                        on_stack[target] = True
+                        calls.append((target, self.indptr[target]))
+                    elif on_stack[target]:
+                        lowlink[frame] = min(lowlink[frame], index[target])
+                    continue
+
+                calls.pop()
+                if calls:
+                    parent = calls[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[frame])
+                if lowlink[frame] == index[frame]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == frame:
+                            break
+                    components.append(sorted(component))
+        return components
+
+    def save(self, path):
+        encoded = [name.encode('utf-8') for name in self.names]
+        name_offsets = array('I', [0])
+        for name in encoded:
+            name_offsets.append(name_offsets[-1] + len(name))
+        with open(path, 'wb') as f:
+            f.write(_HEADER.pack(MAGIC, len(self), self.num_edges, name_offsets[-1]))
+            for section in (self.indptr, self.indices, name_offsets):
+                f.write(_to_little_endian(section))
+            for name in encoded:
+                f.write(name)
+
+    @classmethod
+    def load(cls, path):
+        data = Path(path).read_bytes()
+        magic, frame_count, edge_count, data_size = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a link graph")
+
+        offset = _HEADER.size
+        sections = []
+        for count in (frame_count + 1, edge_count, frame_count + 1):
+            sections.append(_from_bytes(data[offset:offset + count * 4]))
+            offset += count * 4
+        indptr, indices, name_offsets = sections
+        name_data = data[offset:offset + data_size]
+        names = [name_data[start:end].decode('utf-8')
+                 for start, end in zip(name_offsets, name_offsets[1:])]
+        return cls(names, indptr, indices)
+
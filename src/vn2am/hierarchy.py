@@ -0,0 +1,109 @@
+import json
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from vn2am.semantic_tree import build_semantic_graph, build_value_node_map, build_common_ancestor_table
+
+# Package data, installed next to the modules
+data_dir = Path(__file__).parent/"data"
+SEMANTIC_TREE_PATH = data_dir/"vn_semanticrole_hierarchy.json"
+
+
+def search_top_themrole(themrole, entry):
+    current_top_node = ""
+
+    # Search the themrole from the root of themrole tree to find its top parent
+    def dfs(themrole, entry, current_top_node):
+        if entry['value'] == 'Affector':
+            current_top_node = 'Affector'
+        elif entry['value'] == 'Undergoer':
+            current_top_node = 'Undergoer'
+        elif entry['value'] == 'Property':
+            current_top_node = 'Property'
+        elif entry['value'] == 'Place':
+            current_top_node = 'Place'
+
+        if entry['value'].lower() == themrole:
+            return current_top_node
+        for child in entry.get('children', []):
+            result = dfs(themrole, child, current_top_node)
+            if result:
+                return result
+        return "Not-Exist"
+
+    current_top_node = dfs(themrole, entry, "")
+    return current_top_node if current_top_node else themrole
+
+
+def get_tree_themroles(tree: dict) -> frozenset:
+    """
+    All lowercased themroles in the tree
+    """
+    themroles = set()
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        themroles.add(node['value'].lower())
+        stack.extend(node.get('children', []))
+    return frozenset(themroles)
+
+
+def build_top_themrole_index(tree: dict) -> dict:
+    """
+    Map every lowercased themrole in the tree to its top category
+    """
+    return {themrole: search_top_themrole(themrole, tree)
+            for themrole in get_tree_themroles(tree)}
+
+
+class ThemroleHierarchy:
+    """
+    Read-only view of the themrole hierarchy, built once and shared by
+    the parser, dedup and link functions so no hot path reads the file again.
+    """
+    def __init__(self, tree: dict):
+        self.tree = tree
+        # frozenset of lowercased themroles
+        self.themroles = get_tree_themroles(tree)
+        # {themrole: SemanticTreeNode}
+        self.root = build_semantic_graph(tree)
+        self.value_to_node = MappingProxyType(build_value_node_map(self.root))
+        # Closest common ancestors of every pair of themroles, read by find_closest_common_ancestor
+        build_common_ancestor_table(self.root)
+        # {themrole: top category}
+        self.top_themroles = MappingProxyType(build_top_themrole_index(tree))
+        self._other_top_themroles = {}
+
+    def __reduce__(self):
+        # Rebuilt from the tree when sent to worker processes
+        return (ThemroleHierarchy, (self.tree,))
+
+    @classmethod
+    def from_file(cls, tree_path=SEMANTIC_TREE_PATH):
+        with open(tree_path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def get_top_themrole(self, themrole):
+        """
+        Top category of a themrole, same result as searching the tree
+        """
+        top_themrole = self.top_themroles.get(themrole)
+        if top_themrole is not None:
+            return top_themrole
+        # Values that are not in the tree, such as constants
+        if themrole not in self._other_top_themroles:
+            self._other_top_themroles[themrole] = search_top_themrole(themrole, self.tree)
+        return self._other_top_themroles[themrole]
+
+
+def load_hierarchy(tree_path=None) -> ThemroleHierarchy:
+    """
+    Loads a themrole hierarchy once per path, the default tree when no path is given
+    """
+    # The default and the same path given explicitly share one cache entry
+    return _load_hierarchy(tree_path or SEMANTIC_TREE_PATH)
+
+
+@lru_cache(maxsize=None)
+def _load_hierarchy(tree_path) -> ThemroleHierarchy:
+    return ThemroleHierarchy.from_file(tree_path)
@@ -0,0 +1,151 @@
+import re
+from typing import NamedTuple
+from vn2am.hierarchy import ThemroleHierarchy, load_hierarchy
+from vn2am.semantic_tree import get_cached_ancestors
+
+PARTS = ('preconditions', 'postconditions')
+_CONDITION_TEXT = re.compile(r'^\s*(not\s+|!)?\s*([^\s(]+)\s*\((.*)\)\s*$')
+
+
+class ActionRef(NamedTuple):
+    """
+    A frame (action model) of the dedup output
+    """
+    class_id: str
+    frame_number: int
+    frame: dict
+
+    @property
+    def name(self) -> str:
+        # Same frame names as the link functions
+        return f"{self.class_id}-{self.frame_number}"
+
+
+def parse_condition(text: str) -> tuple:
+    """
+    Parses 'has_location(theme, destination)' or 'not has_location(...)'
+    (also '!has_location(...)') into (negated, predicate, args)
+    """
+    match = _CONDITION_TEXT.match(text)
+    if match is None:
+        raise ValueError(f"invalid condition '{text}'")
+    negated, predicate, args = match.groups()
+    args = tuple(arg.strip() for arg in args.split(',') if arg.strip())
+    return negated is not None, predicate, args
+
+
+def get_top_level_roles(themrole: str, hierarchy: ThemroleHierarchy) -> frozenset:
+    """
+    Roles right below the root of the hierarchy (Affector, Undergoer, Place, Property)
+    that are the themrole or one of its ancestors
+    """
+    node = hierarchy.value_to_node.get(themrole)
+    if node is None:
+        return frozenset()
+    return frozenset(candidate.value for candidate in [node, *get_cached_ancestors(node)]
+                     if hierarchy.root in candidate.parents)
+
+
+class ActionModelIndex:
+    """
+    Hash indexes over the action models of the dedup output, by class_id,
+    predicate, (predicate, bool), condition, argument themrole and top-level role.
+    query() intersects any combination of them.
+    """
+    def __init__(self, data: list, hierarchy: ThemroleHierarchy = None):
+        hierarchy = hierarchy or load_hierarchy()
+        self.actions = []           # ActionRef in frame order
+        self.class_ids = {}         # {class_id: {frame id}}
+        self.predicates = {}        # {(part, predicate): {frame id}}
+        self.signed_predicates = {} # {(part, predicate, negated): {frame id}}
+        self.conditions = {}        # {(part, negated, predicate, args): {frame id}}
+        self.themroles = {}         # {themrole: {frame id}}
+        self.top_roles = {}         # {top-level role: {frame id}}
+
+        top_level_roles = {}
+        for entry in data:
+            class_id = entry.get('class_id', 'null')
+            for frame_number, frame in enumerate(entry.get('frames', [])):
+                frame_id = len(self.actions)
+                self.actions.append(ActionRef(class_id, frame_number, frame))
+                self.class_ids.setdefault(class_id, set()).add(frame_id)
+
+                roles = set(frame.get('arguments', []))
+                for part in PARTS:
+                    for bool_value, predicate, args, *_ in frame.get(part, []):
+                        negated = bool_value == 'not'
+                        args = tuple(arg for arg in args if arg != 'Event')
+                        roles.update(args)
+                        # Part None answers queries on both parts
+                        for key_part in (part, None):
+                            self.predicates.setdefault((key_part, predicate), set()).add(frame_id)
+                            self.signed_predicates.setdefault(
+                                (key_part, predicate, negated), set()).add(frame_id)
+                            self.conditions.setdefault(
+                                (key_part, negated, predicate, args), set()).add(frame_id)
+
+                for role in roles:
+                    self.themroles.setdefault(role, set()).add(frame_id)
+                    if role not in top_level_roles:
+                        top_level_roles[role] = get_top_level_roles(role, hierarchy)
+                    for top_role in top_level_roles[role]:
+                        self.top_roles.setdefault(top_role, set()).add(frame_id)
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    def query(self, class_id: str = None, predicate: str = None, negated: bool = None,
+              condition=None, themrole: str = None, top_role: str = None,
+              part: str = None) -> list:
+        """
+        Action models matching every given criterion, in frame order.
+        part ('preconditions' or 'postconditions') restricts the predicate,
+        negated and condition criteria, which otherwise match either part.
+        condition is a (negated, predicate, args) tuple or a text such as
+        'not has_location(theme, destination)'.
+        """
+        if part is not None and part not in PARTS:
+            raise ValueError(f"part must be one of {PARTS}")
+
+        candidates = []
+        if class_id is not None:
+            candidates.append(self.class_ids.get(class_id, set()))
+        if predicate is not None:
+            if negated is None:
+                candidates.append(self.predicates.get((part, predicate), set()))
+            else:
+                candidates.append(self.signed_predicates.get((part, predicate, negated), set()))
+        elif negated is not None:
+            raise ValueError("negated needs a predicate")
+        if condition is not None:
+            if isinstance(condition, str):
+                condition = parse_condition(condition)
+            cond_negated, cond_predicate, cond_args = condition
+            candidates.append(self.conditions.get(
+                (part, cond_negated, cond_predicate, tuple(cond_args)), set()))
+        if themrole is not None:
+            candidates.append(self.themroles.get(themrole, set()))
+        if top_role is not None:
+            candidates.append(self.top_roles.get(top_role.lower(), set()))
+
+        if not candidates:
+            return list(self.actions)
+        candidates.sort(key=len)
+        frame_ids = set(candidates[0])
+        for other in candidates[1:]:
+            frame_ids.intersection_update(other)
+            if not frame_ids:
+                break
+        return [self.actions[frame_id] for frame_id in sorted(frame_ids)]
+
+    def with_effect(self, condition) -> list:
+        """
+        Action models with the condition in their postconditions
+        """
+        return self.query(condition=condition, part='postconditions')
+
+    def with_precondition(self, condition) -> list:
+        """
+        Action models with the condition in their preconditions
+        """
+        return self.query(condition=condition, part='preconditions')
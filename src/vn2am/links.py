@@ -0,0 +1,110 @@
+from vn2am.hierarchy import ThemroleHierarchy, load_hierarchy
+from vn2am.utils import compare_predicate_args
+
+
+def condition_key(cond) -> tuple:
+    """
+    Key of a formatted condition used to find link candidates,
+    only conditions with the same bool value, predicate and arity can link
+    """
+    bool_val, pred_name, args = cond[:3]
+    return (bool_val, pred_name, len(args))
+
+
+class LinkIndex:
+    """
+    Index of the preconditions and postconditions of all action models,
+    keyed by (bool, predicate, arity).
+    Gives the same links as link_pre_to_post and link_post_to_pre in vn2am.utils
+    but only compares arguments of candidates with a matching key.
+    """
+    def __init__(self, am_data: list, value_to_node: dict = None,
+                 hierarchy: ThemroleHierarchy = None):
+        hierarchy = hierarchy or load_hierarchy()
+        self.am_data = am_data
+        self.value_to_node = value_to_node if value_to_node is not None else hierarchy.value_to_node
+        self.themroles = hierarchy.themroles
+        # {key: [(frame_number, frame_name, args), ...]} in frame order
+        self.postconditions = {}
+        self.preconditions = {}
+        self.frame_without_postcondition = False
+        self._pre_links = {}
+        self._post_links = {}
+
+        frame_number = 0
+        for entry in am_data:
+            verb = entry.get('class_id', 'null')
+            frames = entry.get('frames', [])
+            for i, frame in enumerate(frames):
+                frame_name = f'{verb}-{i}'
+                postconditions = frame.get("postconditions", [])
+                if len(postconditions) == 0:
+                    self.frame_without_postcondition = True
+                for cond in postconditions:
+                    self.postconditions.setdefault(condition_key(cond), []) \
+                        .append((frame_number, frame_name, cond[2]))
+                for cond in frame.get("preconditions", []):
+                    self.preconditions.setdefault(condition_key(cond), []) \
+                        .append((frame_number, frame_name, cond[2]))
+                frame_number += 1
+
+    def find_linked_frames(self, cond, index: dict) -> list:
+        """
+        (frame_number, frame_name) of frames that have a condition matching cond, in frame order
+        """
+        links = []
+        linked_frame = None
+        for frame_number, frame_name, other_args in index.get(condition_key(cond), []):
+            if frame_number == linked_frame:
+                # This frame is already linked
+                continue
+            if compare_predicate_args(cond[2], other_args, self.value_to_node, self.themroles):
+                links.append((frame_number, frame_name))
+                linked_frame = frame_number
+        return links
+
+    def find_links(self, cond, index: dict) -> list:
+        """
+        Names of frames that have a condition matching cond, in frame order
+        """
+        return [frame_name for _, frame_name in self.find_linked_frames(cond, index)]
+
+    def link_pre_to_post(self, preconditions: list) -> dict:
+        if preconditions and self.frame_without_postcondition:
+            raise ValueError("Valid action model always have postcondition")
+        pre_links = {}
+        for precond in preconditions:
+            cache_key = (precond[0], precond[1], tuple(precond[2]))
+            if cache_key not in self._pre_links:
+                self._pre_links[cache_key] = self.find_links(precond, self.postconditions)
+            precond_name = f"{'not' if precond[0] == 'not' else ''}{precond[1]}({','.join(precond[2])})"
+            pre_links[precond_name] = list(self._pre_links[cache_key])
+        return pre_links
+
+    def link_post_to_pre(self, postconditions: list) -> dict:
+        post_links = {}
+        for postcond in postconditions:
+            cache_key = (postcond[0], postcond[1], tuple(postcond[2]))
+            if cache_key not in self._post_links:
+                self._post_links[cache_key] = self.find_links(postcond, self.preconditions)
+            postcond_name = f"{'!' if postcond[0] == '!' else ''}{postcond[1]}({','.join(postcond[2])})"
+            post_links[postcond_name] = list(self._post_links[cache_key])
+        return post_links
+
+    def link_all(self) -> list:
+        """
+        Computes incoming and outgoing links of every frame in one pass
+        """
+        all_links = []
+        for entry in self.am_data:
+            frame_links = []
+            for frame in entry.get('frames', []):
+                frame_links.append({
+                    'incoming_links': self.link_pre_to_post(frame.get('preconditions', [])),
+                    'outgoing_links': self.link_post_to_pre(frame.get('postconditions', [])),
+                })
+            all_links.append({
+                'class_id': entry.get('class_id', 'null'),
+                'frames': frame_links
+            })
+        return all_links
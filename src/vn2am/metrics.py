@@ -0,0 +1,115 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+
+# Set to enable stage timings, also seen by worker processes
+PROFILE_ENV = 'VN2AM_PROFILE'
+
+
+class Metrics:
+    """
+    Per stage wall time, CPU time and peak allocation, and pipeline counters.
+    Counters are always kept (they are cheap), stages are only measured when
+    profiling is enabled, otherwise stage() does nothing.
+    """
+    def __init__(self, enabled: bool = None):
+        if enabled is None:
+            enabled = os.environ.get(PROFILE_ENV, '') not in ('', '0')
+        self.enabled = enabled
+        # {stage: {'calls', 'wall_seconds', 'cpu_seconds', 'peak_alloc_bytes'}}
+        self.stages = {}
+        # {counter: value}
+        self.counters = {}
+
+    def enable(self):
+        self.enabled = True
+        os.environ[PROFILE_ENV] = '1'
+
+    def count(self, name: str, value: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def add_stage(self, name: str, calls: int, wall_seconds: float, cpu_seconds: float,
+                  peak_alloc_bytes: int):
+        stage = self.stages.setdefault(
+            name, {'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'peak_alloc_bytes': 0})
+        stage['calls'] += calls
+        stage['wall_seconds'] += wall_seconds
+        stage['cpu_seconds'] += cpu_seconds
+        stage['peak_alloc_bytes'] = max(stage['peak_alloc_bytes'], peak_alloc_bytes)
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Measures the enclosed block as one call of a stage, stages must not be nested
+        """
+        if not self.enabled:
+            yield
+            return
+        # Only imported when profiling
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        alloc_start = tracemalloc.get_traced_memory()[0]
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            self.add_stage(name, 1,
+                           time.perf_counter() - wall_start,
+                           time.process_time() - cpu_start,
+                           tracemalloc.get_traced_memory()[1] - alloc_start)
+
+    def iter_stage(self, name: str, iterable):
+        """
+        Measures the time spent producing each item of a lazy iterable as a stage
+        """
+        if not self.enabled:
+            return iterable
+        return self._iter_stage(name, iter(iterable))
+
+    def _iter_stage(self, name, iterator):
+        while True:
+            with self.stage(name):
+                item = next(iterator, StopIteration)
+            if item is StopIteration:
+                return
+            yield item
+
+    @contextmanager
+    def capture(self):
+        """
+        Collects the counters and stages of the enclosed block in a separate
+        Metrics, so they can be sent back from a worker or cached with a class
+        """
+        captured = Metrics(self.enabled)
+        stages, counters = self.stages, self.counters
+        self.stages, self.counters = captured.stages, captured.counters
+        try:
+            yield captured
+        finally:
+            self.stages, self.counters = stages, counters
+
+    def merge(self, counters: dict = None, stages: dict = None):
+        for name, value in (counters or {}).items():
+            self.count(name, value)
+        for name, stage in (stages or {}).items():
+            self.add_stage(name, stage['calls'], stage['wall_seconds'], stage['cpu_seconds'],
+                           stage['peak_alloc_bytes'])
+
+    def to_dict(self) -> dict:
+        return {
+            'stages': self.stages,
+            'counters': dict(sorted(self.counters.items())),
+        }
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+# Shared by the pipeline modules
+metrics = Metrics()
@@ -0,0 +1,147 @@
+import sys
+from typing import NamedTuple
+
+
+def intern(value):
+    """
+    Intern annotation strings, so repeated predicates, themroles and
+    event tags share one string object
+    """
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Argument(NamedTuple):
+    """
+    A semantic argument, serialized as [arg_type, value]
+    """
+    arg_type: str
+    value: str
+
+    @classmethod
+    def from_json(cls, data):
+        arg_type, value = data
+        return intern_argument(arg_type, value)
+
+
+_arguments = {}
+
+
+def intern_argument(arg_type, value) -> Argument:
+    """
+    Shared Argument for a (arg_type, value) pair, repeated arguments are
+    neither rebuilt nor stored twice
+    """
+    key = (arg_type, value)
+    argument = _arguments.get(key)
+    if argument is None:
+        argument = _arguments[key] = Argument(intern(arg_type), intern(value))
+    return argument
+
+
+def get_condition_constants(cond) -> tuple:
+    """
+    Values of the 'Constant' arguments of a filtered condition, in argument order.
+    Conditions with constants are serialized as [bool_value, predicate, args, constants],
+    the others as [bool_value, predicate, args].
+    """
+    return tuple(cond[3]) if len(cond) > 3 else ()
+
+
+class Semantic(NamedTuple):
+    """
+    A semantic predicate of a frame,
+    serialized as [arg_event, predicate, args, bool_value]
+    """
+    arg_event: tuple    # event tags of the predicate
+    predicate: str
+    args: tuple         # Argument
+    bool_value: str     # '!' or None
+
+    @classmethod
+    def from_json(cls, data):
+        arg_event, predicate, args, bool_value = data
+        return cls(tuple(intern(tag) for tag in arg_event),
+                   intern(predicate),
+                   tuple(Argument.from_json(arg) for arg in args),
+                   intern(bool_value))
+
+
+class FrameAnalysis(NamedTuple):
+    """
+    Everything extracted from the semantics of a frame in one pass
+    """
+    event_index: dict           # {event tag: order of appearance}
+    arguments: list             # sorted Argument
+    example_text: list
+    semantics: list             # Semantic
+    activity_event_tag: str     # event tag of the first activity predicate, or None
+
+
+class Record:
+    """
+    Base of the slotted records, readable like the dicts they replace
+    """
+    __slots__ = ()
+
+    def get(self, name, default=None):
+        if name in self.__slots__:
+            return getattr(self, name)
+        return default
+
+    def __getitem__(self, name):
+        if name not in self.__slots__:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Frame(Record):
+    """
+    An action model extracted from one VerbNet frame
+    """
+    __slots__ = ('example_text', 'arguments', 'preconditions', 'postconditions')
+
+    def __init__(self, example_text: list, arguments: list,
+                 preconditions: list, postconditions: list):
+        self.example_text = example_text
+        self.arguments = arguments
+        self.preconditions = preconditions
+        self.postconditions = postconditions
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(data['example_text'],
+                   [Argument.from_json(arg) for arg in data['arguments']],
+                   [Semantic.from_json(cond) for cond in data['preconditions']],
+                   [Semantic.from_json(cond) for cond in data['postconditions']])
+
+
+class ActionModel(Record):
+    """
+    All action models extracted from one VerbNet class
+    """
+    __slots__ = ('class_id', 'frames')
+
+    def __init__(self, class_id: str, frames: list):
+        self.class_id = class_id
+        self.frames = frames
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(data['class_id'], [Frame.from_dict(frame) for frame in data['frames']])
+
+
+def to_json(obj):
+    """
+    json.dump default hook, writes records in the same shape as the dicts they replace
+    """
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
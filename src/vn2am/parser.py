@@ -1,24 +1,172 @@
 import json
 import logging
+import re
+from vn2am.model import FrameAnalysis, Semantic, intern, intern_argument
 DEBUG = False
 
+CHUNK_SIZE = 1 << 16
 
-def get_VN_entries(file_path: str, start_entry: int = None, end_entry: int = None) -> list:
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_STRUCTURE = re.compile(r'[\[\]{}"]')
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_NUMBER_TAIL = re.compile(r'[0-9.eE+\-]*\Z')
+
+
+class _JSONArrayReader:
     """
-    Reads VerbNet JSON file and returns its entries list
+    Incremental reader over a JSON text file. It only keeps the unconsumed
+    tail of the file in memory, decodes the values it is asked for and skips
+    the others by matching brackets without building any objects.
     """
-    with open(file_path, 'r') as f:
-        data = json.load(f)
+    def __init__(self, f, chunk_size: int = CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+
+    def fill(self) -> bool:
+        # Read at least as much as is already buffered,
+        # so retrying a partial decode stays linear
+        chunk = self.f.read(max(self.chunk_size, len(self.buf) - self.pos))
+        if not chunk:
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                raise ValueError("Unexpected end of JSON input")
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(
+                f"Expected '{char}' but found '{self.buf[self.pos]}' in JSON input")
+        self.pos += 1
+
+    def decode_value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+            if is_number and _NUMBER_TAIL.match(self.buf, end) and self.fill():
+                # The number may continue in the next chunk
+                continue
+            self.pos = end
+            return value
 
-    if start_entry is not None and end_entry is not None:
-        entries = data.get('VerbNet', [])[start_entry:end_entry]
-    else:
-        entries = data.get('VerbNet', [])
+    def skip_value(self):
+        if self.peek() not in '[{':
+            self.decode_value()
+            return
+        depth = 0
+        while True:
+            match = _STRUCTURE.search(self.buf, self.pos)
+            if match is None:
+                # Nothing left to keep in this chunk
+                self.pos = len(self.buf)
+                if not self.fill():
+                    raise ValueError("Unexpected end of JSON input")
+                continue
+            char = match.group()
+            if char == '"':
+                string = _STRING.match(self.buf, match.start())
+                if string is None:
+                    # String continues in the next chunk
+                    self.pos = match.start()
+                    if not self.fill():
+                        raise ValueError("Unexpected end of JSON input")
+                    continue
+                self.pos = string.end()
+                continue
+            self.pos = match.end()
+            depth += 1 if char in '[{' else -1
+            if depth == 0:
+                return
+
+    def seek_key(self, key: str) -> bool:
+        """
+        Move to the value of a key in the top level object
+        """
+        self.expect('{')
+        while True:
+            char = self.peek()
+            if char == '}':
+                return False
+            if char == ',':
+                self.pos += 1
+            current_key = self.decode_value()
+            self.expect(':')
+            if current_key == key:
+                return True
+            self.skip_value()
+
+    def iter_array(self, start: int = 0, end: int = None):
+        """
+        Yields decoded items of the array at the current position,
+        items with index outside [start, end) are skipped without decoding
+        """
+        self.expect('[')
+        index = 0
+        while True:
+            char = self.peek()
+            if char == ']':
+                return
+            if char == ',':
+                self.pos += 1
+            if end is not None and index >= end:
+                return
+            if index < start:
+                self.skip_value()
+            else:
+                yield self.decode_value()
+            index += 1
+
+
+def iter_VN_entries(file_path: str, start_entry: int = None, end_entry: int = None):
+    """
+    Lazily yields entries of the VerbNet JSON file one class at a time.
+    Entries before start_entry are skipped without being parsed and
+    reading stops at end_entry.
+    """
+    if (start_entry or 0) < 0 or (end_entry or 0) < 0:
+        # Negative indices need the length of the list, fall back to slicing
+        yield from get_VN_entries(file_path)[start_entry:end_entry]
+        return
+
+    count = 0
+    with open(file_path, 'r', encoding='utf-8') as f:
+        reader = _JSONArrayReader(f)
+        if not reader.seek_key('VerbNet'):
+            return
+        for entry in reader.iter_array(start_entry or 0, end_entry):
+            count += 1
+            yield entry
 
     if DEBUG:
         logging.info(
-            f"Loaded {len(entries)} entries (including subclasses) from {file_path}")
-    return entries
+            f"Loaded {count} entries (including subclasses) from {file_path}")
+
+
+def get_VN_entries(file_path: str, start_entry: int = None, end_entry: int = None) -> list:
+    """
+    Reads VerbNet JSON file and returns its entries list
+    """
+    if (start_entry or 0) < 0 or (end_entry or 0) < 0:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data.get('VerbNet', [])[start_entry:end_entry]
+    return list(iter_VN_entries(file_path, start_entry, end_entry))
 
 
 def get_frames(entries: list) -> list:
@@ -49,13 +197,11 @@ def get_example_text(frame: dict) -> list:
 def get_semantic_args(args: list) -> list:
     """
     Extract all args from semantic, including events
-    return a list of tuples in form of (arg_type, arg_value)
+    return a list of Argument tuples in form of (arg_type, arg_value)
     """
     arguments = []
     for arg in args:
-        arg_type = arg.get('arg_type')
-        arg_value = arg.get('value')
-        arguments.append((arg_type, arg_value))
+        arguments.append(intern_argument(arg.get('arg_type'), arg.get('value')))
     return arguments
 
 
@@ -63,7 +209,7 @@ def get_semantic_args_without_event(args: tuple) -> list:
     arguments = []
     for arg in args:
         if arg[0] != 'Event':  # Ignore event arguments
-            arguments.append((arg[0], arg[1]))
+            arguments.append(intern_argument(arg[0], arg[1]))
     return arguments
 
 
@@ -74,25 +220,82 @@ def get_event_tags(args: list) -> list:
     event_tags = []
     for arg in args:
         if arg.get('arg_type') == 'Event':
-            event_tags.append(arg.get('value'))
+            event_tags.append(intern(arg.get('value')))
     return event_tags
 
 
+def analyze_frame(frame: dict, themroles=(), is_activity_predicate=None) -> FrameAnalysis:
+    """
+    Walks the semantics of a frame once and returns its event index, arguments
+    (Only keep the themrole appear in Roles field), example texts, semantic tuples
+    and the event tag of the first activity predicate
+    """
+    event_index = {}
+    arguments = set()
+    semantic_list = []
+    activity_event_tag = None
+
+    for semantic in frame.get('semantics', []):
+        predicate = intern(semantic.get('predicate'))
+        bool_value = intern(semantic.get('bool', None))
+        arg_values = []
+        arg_event = []
+        for arg in semantic.get('args', []):
+            argument = intern_argument(arg.get('arg_type'), arg.get('value'))
+            arg_type, arg_value = argument
+            arg_values.append(argument)
+            if arg_type == 'Event':
+                arg_event.append(arg_value)
+            if arg_type == 'ThemRole':
+                arguments.add(argument)
+            elif arg_value.removeprefix("?").lower() in themroles:
+                arguments.add(argument)
+
+        # Index event labels according to their order of appearance
+        if len(arg_event) == 1:
+            if arg_event[0] not in event_index:
+                event_index[arg_event[0]] = len(event_index)
+            if activity_event_tag is None and is_activity_predicate \
+                    and is_activity_predicate(predicate):
+                activity_event_tag = arg_event[0]
+
+        semantic_list.append(
+            Semantic(tuple(arg_event), predicate, tuple(arg_values), bool_value))
+
+    return FrameAnalysis(
+        event_index=event_index,
+        arguments=sorted(arguments),
+        example_text=get_example_text(frame),
+        semantics=semantic_list,
+        activity_event_tag=activity_event_tag,
+    )
+
+
+def specialize_analysis(analysis: FrameAnalysis, themroles=(), is_activity_predicate=None) -> FrameAnalysis:
+    """
+    Arguments and activity event tag of an analysis made by analyze_frame without
+    themroles or activity predicates, so one parse of a frame can serve several
+    hierarchies and predicate filters. Same result as analyze_frame with them.
+    """
+    arguments = set()
+    activity_event_tag = None
+    for arg_event, predicate, args, _ in analysis.semantics:
+        for argument in args:
+            arg_type, arg_value = argument
+            if arg_type == 'ThemRole' or arg_value.removeprefix("?").lower() in themroles:
+                arguments.add(argument)
+        if activity_event_tag is None and len(arg_event) == 1 and is_activity_predicate \
+                and is_activity_predicate(predicate):
+            activity_event_tag = arg_event[0]
+    return analysis._replace(arguments=sorted(arguments), activity_event_tag=activity_event_tag)
+
+
 def get_semantics(frame: dict) -> list:
     """
-    convert semantic annotation in verbnet into a list of tuples in form of
+    convert semantic annotation in verbnet into a list of Semantic tuples in form of
     (arg_event, predicate, args, bool_value)
     """
-    semantics = frame.get('semantics', {})
-    semantic_list = []
-    for semantic in semantics:
-        predicate = semantic.get('predicate')
-        args = semantic.get('args', [])
-        bool_value = semantic.get('bool', None)
-        arg_values = get_semantic_args(args)
-        arg_event = get_event_tags(args)
-        semantic_list.append((arg_event, predicate, arg_values, bool_value))
-    return semantic_list
+    return analyze_frame(frame).semantics
 
 
 def get_themroles(entry: dict) -> list:
@@ -107,18 +310,7 @@ def get_arguments(frame: dict, themroles: list) -> list:
     """
     Extracts arguments from a frame (Only keep the themrole appear in Roles field)
     """
-    semantics = frame.get('semantics', {})
-    
-    arguments = set()
-    for semantic in semantics:
-        args = semantic.get('args', [])
-        arg_values = get_semantic_args(args)
-        for arg_type, arg_value in arg_values:
-            if arg_type == 'ThemRole':
-                arguments.add((arg_type, arg_value))
-            elif arg_value.removeprefix("?").lower() in themroles:
-                arguments.add((arg_type, arg_value))
-    return sorted(list(arguments))
+    return analyze_frame(frame, themroles).arguments
 
 
 def get_hidden_arguments(frame: dict) -> list:
@@ -143,20 +335,7 @@ def get_event_index(frame: dict) -> dict:
     """
     Index event labels in the frame according to their order of appearance.
     """
-    event_index = {}
-    semantics = frame.get('semantics', [])
-    index = 0
-    for semantic in semantics:
-        args = semantic.get('args', [])
-        arg_event = get_event_tags(args)
-        if not arg_event:
-            continue
-        is_single_event = len(arg_event) == 1
-        is_new_event = arg_event[0] not in event_index
-        if is_single_event and is_new_event:
-            event_index[arg_event[0]] = index
-            index += 1
-    return event_index
+    return analyze_frame(frame).event_index
 
 
 def log_example_text(Examples: list):
@@ -167,6 +346,8 @@ def log_semantics(semantic_list: list):
     for arg_event, predicate, args, bool_value in semantic_list:
         args_str = ','.join(
             [f"{arg_type} {arg_value}" for arg_type, arg_value in args])
+        # Event tags are shown as a list
+        arg_event = list(arg_event)
 
         if bool_value == "!":
             logging.info(f"\t  {arg_event} !{predicate}({args_str})")
@@ -0,0 +1,198 @@
+import re
+from pathlib import Path
+from vn2am.hierarchy import ThemroleHierarchy, load_hierarchy
+from vn2am.model import get_condition_constants
+from vn2am.utils import remove_themrole_mark
+
+REQUIREMENTS = ':strips :typing :negative-preconditions'
+_INVALID_NAME_CHARS = re.compile(r'[^a-z0-9_-]')
+
+
+def pddl_name(text: str) -> str:
+    """
+    Lowercased PDDL name, invalid characters are replaced by '_'
+    and names must start with a letter
+    """
+    name = _INVALID_NAME_CHARS.sub('_', str(text).lower())
+    return name if name[:1].isalpha() else f"x{name}"
+
+
+def get_type_parents(tree: dict) -> dict:
+    """
+    Parent type of every themrole of the hierarchy, the root is a child of object.
+    The hierarchy is not a tree (Initial_Location has several parents),
+    PDDL types have one parent so the first one in tree order is used.
+    """
+    parents = {}
+    stack = [(tree, 'object')]
+    while stack:
+        node, parent = stack.pop()
+        name = pddl_name(node['value'])
+        if name in parents:
+            continue
+        parents[name] = parent
+        stack.extend((child, name) for child in reversed(node.get('children', [])))
+    return parents
+
+
+def get_condition_args(cond) -> list:
+    """
+    Arguments of a filtered condition without its event
+    """
+    return [arg for arg in cond[2] if arg != 'Event']
+
+
+def get_condition_terms(cond, parameters: set) -> list:
+    """
+    PDDL terms of the arguments of a filtered condition, parameters are variables and
+    the other arguments constants. Constant arguments are named after their value.
+    """
+    values = iter(get_condition_constants(cond))
+    terms = []
+    for arg in get_condition_args(cond):
+        if arg in parameters:
+            terms.append(f"?{pddl_name(arg)}")
+        elif arg == 'Constant':
+            terms.append(pddl_name(next(values, arg)))
+        else:
+            terms.append(pddl_name(arg))
+    return terms
+
+
+def collect_signature(data: list) -> tuple:
+    """
+    Arities of every predicate and the constant names (condition arguments
+    that are not parameters of their frame) used by the action models
+    """
+    arities = {}
+    constants = set()
+    for entry in data:
+        for frame in entry.get('frames', []):
+            parameters = set(frame.get('arguments', []))
+            for cond in frame.get('preconditions', []) + frame.get('postconditions', []):
+                terms = get_condition_terms(cond, parameters)
+                arities.setdefault(cond[1], set()).add(len(terms))
+                constants.update(term for term in terms if not term.startswith('?'))
+    return arities, constants
+
+
+def get_predicate_names(arities: dict) -> dict:
+    """
+    PDDL name of every (predicate, arity), predicates used with
+    several arities get the arity as a suffix
+    """
+    names = {}
+    for predicate, predicate_arities in arities.items():
+        for arity in predicate_arities:
+            name = pddl_name(predicate)
+            names[(predicate, arity)] = name if len(predicate_arities) == 1 else f"{name}-{arity}"
+    return names
+
+
+def format_atom(cond, parameters: set, predicate_names: dict) -> str:
+    bool_value, predicate = cond[0], cond[1]
+    terms = get_condition_terms(cond, parameters)
+    atom = f"({' '.join([predicate_names[(predicate, len(terms))]] + terms)})"
+    return f"(not {atom})" if bool_value == 'not' else atom
+
+
+def format_conjunction(conditions: list, parameters: set, predicate_names: dict) -> str:
+    atoms = [format_atom(cond, parameters, predicate_names) for cond in conditions]
+    return f"(and {' '.join(atoms)})" if atoms else "(and)"
+
+
+def format_parameter(argument: str, types: dict) -> str:
+    """
+    Typed parameter, arguments that are not themroles of the hierarchy are left untyped (object)
+    """
+    name = pddl_name(remove_themrole_mark(argument))
+    return f"?{pddl_name(argument)} - {name}" if name in types else f"?{pddl_name(argument)}"
+
+
+def format_action(name: str, frame: dict, types: dict, predicate_names: dict) -> str:
+    # Hidden arguments can give the same parameter twice
+    arguments = list(dict.fromkeys(frame.get('arguments', [])))
+    parameters = set(arguments)
+    typed_parameters = ' '.join(format_parameter(arg, types) for arg in arguments)
+    return (f"  (:action {name}\n"
+            f"    :parameters ({typed_parameters})\n"
+            f"    :precondition {format_conjunction(frame.get('preconditions', []), parameters, predicate_names)}\n"
+            f"    :effect {format_conjunction(frame.get('postconditions', []), parameters, predicate_names)})\n")
+
+
+def iter_actions(data: list):
+    """
+    Yields a unique action name and the frame of every action model,
+    named after the class and the frame number like the link functions
+    """
+    used_names = set()
+    for entry in data:
+        class_name = pddl_name(entry.get('class_id', 'null'))
+        for i, frame in enumerate(entry.get('frames', [])):
+            name = f"{class_name}-{i}"
+            while name in used_names:
+                name += "_"
+            used_names.add(name)
+            yield name, frame
+
+
+def format_domain_header(domain_name: str, types: dict, constants: set, predicate_names: dict) -> str:
+    children = {}
+    for name, parent in types.items():
+        children.setdefault(parent, []).append(name)
+    type_lines = ''.join(f"    {' '.join(names)} - {parent}\n" for parent, names in children.items())
+    constant_block = (f"  (:constants\n    {' '.join(sorted(constants))}\n  )\n"
+                      if constants else "")
+    predicate_lines = ''.join(
+        f"    ({' '.join([name] + [f'?a{i}' for i in range(arity)])})\n"
+        for (_, arity), name in sorted(predicate_names.items(), key=lambda item: item[1]))
+    return (f"(define (domain {pddl_name(domain_name)})\n"
+            f"  (:requirements {REQUIREMENTS})\n"
+            f"  (:types\n{type_lines}  )\n"
+            f"{constant_block}"
+            f"  (:predicates\n{predicate_lines}  )\n")
+
+
+def get_shard_path(path: Path, shard: int) -> Path:
+    return path.with_name(f"{path.stem}-{shard}{path.suffix}")
+
+
+def write_pddl_domain(data: list, path, hierarchy: ThemroleHierarchy = None,
+                      domain_name: str = 'verbnet', shard_size: int = None) -> list:
+    """
+    Writes the filtered action models as a PDDL domain, one action per frame.
+    Actions are written one at a time. With shard_size, every file holds at most
+    shard_size actions and is a complete domain named domain_name-<shard>.
+    Returns the written paths.
+    """
+    hierarchy = hierarchy or load_hierarchy()
+    path = Path(path)
+    types = get_type_parents(hierarchy.tree)
+    arities, constants = collect_signature(data)
+    predicate_names = get_predicate_names(arities)
+
+    paths = []
+    f = None
+    try:
+        for count, (name, frame) in enumerate(iter_actions(data)):
+            if f is None or (shard_size and count % shard_size == 0):
+                if f is not None:
+                    f.write(")\n")
+                    f.close()
+                shard = len(paths) + 1
+                shard_path = get_shard_path(path, shard) if shard_size else path
+                shard_name = f"{domain_name}-{shard}" if shard_size else domain_name
+                f = open(shard_path, 'w', encoding='utf-8')
+                paths.append(shard_path)
+                f.write(format_domain_header(shard_name, types, constants, predicate_names))
+            f.write(format_action(name, frame, types, predicate_names))
+        if f is None:
+            # No action models, still a valid domain
+            f = open(path, 'w', encoding='utf-8')
+            paths.append(path)
+            f.write(format_domain_header(domain_name, types, constants, predicate_names))
+        f.write(")\n")
+    finally:
+        if f is not None:
+            f.close()
+    return paths
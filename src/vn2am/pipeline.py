@@ -0,0 +1,158 @@
+import os
+from typing import NamedTuple
+from vn2am.converter import PredicateFilter, split_pre_post_conditions, format_filterd_2_pddl, \
+    get_default_filter
+from vn2am.dedup import dedup
+from vn2am.hierarchy import ThemroleHierarchy, load_hierarchy
+from vn2am.metrics import metrics
+from vn2am.model import ActionModel, Frame
+from vn2am.parser import iter_VN_entries, analyze_frame, specialize_analysis
+
+STAGES = ('load', 'analyze', 'conditions', 'dedup', 'format')
+
+
+def build_action_model(class_id: str, analyses: list, predicate_filter: PredicateFilter) -> ActionModel:
+    """
+    Action models of a class from the analyze_frame results of its frames
+    """
+    strips_data = ActionModel(class_id, [])
+    for analysis in analyses:
+        with metrics.stage('conditions'):
+            precondition, postcondition = split_pre_post_conditions(
+                analysis.semantics, analysis.event_index, analysis.activity_event_tag,
+                predicate_filter)
+        metrics.count('frames')
+        strips_data.frames.append(Frame(
+            example_text=analysis.example_text,
+            arguments=analysis.arguments,
+            preconditions=precondition,
+            postconditions=postcondition,
+        ))
+    return strips_data
+
+
+class PipelineResult(NamedTuple):
+    """
+    Outputs of a pipeline run, in the same form as the output files
+    """
+    unfiltered: list    # ActionModel of each class
+    filtered: list      # dedup output
+    pddl: list          # format_filterd_2_pddl output
+
+
+class Pipeline:
+    """
+    Extraction pipeline over in-memory data: load -> analyze -> conditions -> dedup -> format.
+    The hierarchy and the predicate filter are kept between runs, and nothing is
+    written to disk. Each stage is a method that can be called on its own.
+
+    Hooks are called with the output of their stage and may return a replacement
+    (None keeps the output). The per-class stages (load, analyze, conditions) call
+    them for each class, dedup and format with the whole list.
+    """
+    def __init__(self, hierarchy: ThemroleHierarchy = None, predicate_filter: PredicateFilter = None,
+                 merge_subclasses: bool = True, workers: int = 1):
+        self.hierarchy = hierarchy or load_hierarchy()
+        self.predicate_filter = predicate_filter or get_default_filter()
+        self.merge_subclasses = merge_subclasses
+        self.workers = workers
+        self.hooks = {stage: [] for stage in STAGES}
+
+    def add_hook(self, stage: str, hook):
+        if stage not in self.hooks:
+            raise ValueError(f"Unknown stage '{stage}', expected one of {STAGES}")
+        self.hooks[stage].append(hook)
+        return self
+
+    def _run_hooks(self, stage: str, value):
+        for hook in self.hooks[stage]:
+            replaced = hook(value)
+            if replaced is not None:
+                value = replaced
+        return value
+
+    def load(self, source):
+        """
+        VerbNet classes of a JSON file path, of a {'VerbNet': [...]} dict,
+        or of any iterable of class entries, read lazily
+        """
+        if isinstance(source, (str, os.PathLike)):
+            entries = iter_VN_entries(source)
+        elif isinstance(source, dict):
+            entries = source.get('VerbNet', [])
+        else:
+            entries = source
+        for entry in metrics.iter_stage('load', entries):
+            yield self._run_hooks('load', entry)
+
+    def parse_class(self, entry: dict) -> list:
+        """
+        analyze_frame result of every frame of a class, made without themroles or
+        activity predicates so it can be shared by pipelines with other settings.
+        analyze_class specializes it (and runs the analyze hooks).
+        """
+        with metrics.stage('analyze'):
+            return [analyze_frame(frame) for frame in entry.get('frames', [])]
+
+    def analyze_class(self, entry: dict, analyses: list = None):
+        """
+        (class_id, analysis of each frame) of a class, None for a class without class_id.
+        analyses made by parse_class are specialized instead of parsing the frames again.
+        """
+        class_id = entry.get('class_id', 'null')
+        if class_id == 'null':
+            return None
+        themroles = self.hierarchy.themroles
+        is_activity_predicate = self.predicate_filter.is_activity_predicate
+        with metrics.stage('analyze'):
+            if analyses is None:
+                analyses = [analyze_frame(frame, themroles, is_activity_predicate)
+                            for frame in entry.get('frames', [])]
+            else:
+                analyses = [specialize_analysis(analysis, themroles, is_activity_predicate)
+                            for analysis in analyses]
+        return self._run_hooks('analyze', (class_id, analyses))
+
+    def analyze(self, entries):
+        """
+        (class_id, analysis of each frame) of every class with a class_id
+        """
+        for entry in entries:
+            analyzed = self.analyze_class(entry)
+            if analyzed is not None:
+                yield analyzed
+
+    def action_model(self, class_id: str, analyses: list) -> ActionModel:
+        """
+        Unfiltered ActionModel of an analyzed class
+        """
+        return self._run_hooks('conditions', build_action_model(class_id, analyses, self.predicate_filter))
+
+    def extract_conditions(self, analyzed):
+        """
+        Unfiltered ActionModel of every analyzed class
+        """
+        for class_id, analyses in analyzed:
+            yield self.action_model(class_id, analyses)
+
+    def deduplicate(self, strips_model) -> list:
+        with metrics.stage('dedup'):
+            deduped = dedup(list(strips_model), self.hierarchy, workers=self.workers,
+                            merge_subclasses=self.merge_subclasses)
+        return self._run_hooks('dedup', deduped)
+
+    def format(self, deduped: list) -> list:
+        with metrics.stage('format'):
+            pddl_model = format_filterd_2_pddl(deduped)
+        return self._run_hooks('format', pddl_model)
+
+    def extract(self, source):
+        """
+        Unfiltered ActionModel of each class of source, one class at a time
+        """
+        return self.extract_conditions(self.analyze(self.load(source)))
+
+    def run(self, source) -> PipelineResult:
+        strips_model = list(self.extract(source))
+        deduped = self.deduplicate(strips_model)
+        return PipelineResult(strips_model, deduped, self.format(deduped))
@@ -1,12 +1,22 @@
+from functools import lru_cache
+
+
 class SemanticTreeNode:
     def __init__(self, value):
         self.value = value
         self.children = []
         self.parents = []
+        # {other node: closest common ancestor}, filled by build_common_ancestor_table
+        self.common_ancestors = {}
 
     def add_child(self, child_node):
         self.children.append(child_node)
         child_node.parents.append(self)
+        # Ancestors have changed, drop memoized results and precomputed tables
+        get_cached_ancestors.cache_clear()
+        memoized_common_ancestor.cache_clear()
+        if self.common_ancestors or child_node.common_ancestors:
+            clear_common_ancestor_table(self)
 
     def print_tree(self, level=0):
         print("   " * level + str(self.value))
@@ -65,17 +75,81 @@ def get_ancestors(node):
     return ancestors
 
 
-def find_closest_common_ancestor(node1, node2):
+# The memoized lookups are bounded, so they do not keep old trees alive
+@lru_cache(maxsize=1024)
+def get_cached_ancestors(node):
+    return get_ancestors(node)
+
+
+def closest_common_ancestor(node1, node2, ancestors1, ancestors2):
     if node1 == node2:
         return node1
 
-    ancestors1 = get_ancestors(node1)
-    ancestors2 = get_ancestors(node2)
-
     common = set(ancestors1.keys()) & set(ancestors2.keys())
     if not common:
         return None
 
     # Pick the common ancestor with the smallest combined distance
     closest = min(common, key=lambda n: ancestors1[n] + ancestors2[n])
-    return closest
\ No newline at end of file
+    return closest
+
+
+def search_closest_common_ancestor(node1, node2):
+    """
+    Closest common ancestor computed from fresh ancestor walks, without memoization
+    """
+    return closest_common_ancestor(
+        node1, node2, get_ancestors(node1), get_ancestors(node2))
+
+
+@lru_cache(maxsize=16384)
+def memoized_common_ancestor(node1, node2):
+    """
+    Closest common ancestor of two nodes, memoized per pair of nodes
+    """
+    return closest_common_ancestor(
+        node1, node2, get_cached_ancestors(node1), get_cached_ancestors(node2))
+
+
+# Marks a pair missing from the table, the closest common ancestor may be None
+_MISSING = object()
+
+
+def find_closest_common_ancestor(node1, node2):
+    """
+    Closest common ancestor of two nodes, read from the table stored on the
+    nodes by build_common_ancestor_table, or memoized for nodes without one
+    """
+    closest = node1.common_ancestors.get(node2, _MISSING)
+    if closest is _MISSING:
+        return memoized_common_ancestor(node1, node2)
+    return closest
+
+
+def build_common_ancestor_table(root):
+    """
+    Precompute the closest common ancestor of every pair of nodes in the graph
+    and store it in the common_ancestors of each node
+    """
+    nodes = list(build_value_node_map(root).values())
+    ancestors = {node: get_ancestors(node) for node in nodes}
+    for node1 in nodes:
+        node1.common_ancestors = {
+            node2: closest_common_ancestor(node1, node2, ancestors[node1], ancestors[node2])
+            for node2 in nodes}
+
+
+def clear_common_ancestor_table(node):
+    """
+    Drop the tables of every node connected to node
+    """
+    stack = [node]
+    visited = set()
+    while stack:
+        current = stack.pop()
+        if current in visited:
+            continue
+        visited.add(current)
+        current.common_ancestors = {}
+        stack.extend(current.parents)
+        stack.extend(current.children)
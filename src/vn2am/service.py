@@ -0,0 +1,369 @@
+import asyncio
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from vn2am.converter import collect_warnings
+from vn2am.metrics import metrics
+from vn2am.model import to_json
+from vn2am.pipeline import Pipeline
+
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 16 * 1024 * 1024
+# VerbNet class ids are a verb name and a number, e.g. put-9.1 or put_spatial-9.1-1
+CLASS_ID_PATTERN = re.compile(r'[^\s-]+-\d')
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class RequestError(Exception):
+    """
+    A request that cannot be answered, with its HTTP status
+    """
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+    def to_dict(self) -> dict:
+        return {'error': str(self), 'status': self.status}
+
+
+def is_frame_index(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def validate_class(entry: dict):
+    """
+    Checks that a posted VerbNet class has the shape analyze_frame and dedup expect
+    """
+    class_id = entry.get('class_id')
+    if not isinstance(class_id, str) or not CLASS_ID_PATTERN.match(class_id):
+        raise RequestError(400, "'class_id' of the class must be a string like 'put-9.1'")
+    frames = entry.get('frames', [])
+    if not isinstance(frames, list) or not all(isinstance(frame, dict) for frame in frames):
+        raise RequestError(400, "'frames' of the class must be a list of objects")
+    for i, frame in enumerate(frames):
+        examples = frame.get('examples', [])
+        if not isinstance(examples, list) or not all(isinstance(example, dict) for example in examples):
+            raise RequestError(400, f"'examples' of frame {i} must be a list of objects")
+        semantics = frame.get('semantics', [])
+        if not isinstance(semantics, list) or not all(isinstance(semantic, dict) for semantic in semantics):
+            raise RequestError(400, f"'semantics' of frame {i} must be a list of objects")
+        for semantic in semantics:
+            if not isinstance(semantic.get('predicate'), str) \
+                    or not isinstance(semantic.get('bool'), (str, type(None))):
+                raise RequestError(400, f"a semantic of frame {i} needs a string 'predicate' and 'bool'")
+            args = semantic.get('args', [])
+            if not isinstance(args, list) or not all(
+                    isinstance(arg, dict) and isinstance(arg.get('arg_type'), str)
+                    and isinstance(arg.get('value'), str) for arg in args):
+                raise RequestError(400, f"semantic arguments of frame {i} need string 'arg_type' and 'value'")
+
+
+class ExtractionService:
+    """
+    Keeps the parsed corpus and the pipeline (themrole hierarchy, predicate filter
+    and hooks) in memory and converts single classes or frames on demand. Results
+    are kept in an LRU cache keyed by the class_id or by a digest of the posted class.
+    """
+    def __init__(self, corpus: dict, pipeline: Pipeline, cache_size: int = 1024):
+        self.corpus = corpus    # {class_id: Pipeline.parse_class result}
+        self.pipeline = pipeline
+        self.cache_size = cache_size
+        self.results = OrderedDict()
+        self.stats = {'requests': 0, 'items': 0, 'batches': 0, 'errors': 0,
+                      'internal_errors': 0, 'cache_hits': 0, 'cache_misses': 0}
+        # Pipeline counters, copied by the worker thread after each batch
+        self.counters = {}
+        self.latencies = deque(maxlen=1000)
+
+    @classmethod
+    def from_file(cls, input_path, pipeline: Pipeline, cache_size: int = 1024):
+        """
+        Parses the corpus once with Pipeline.parse_class, the analyses are
+        specialized for the hierarchy and the filter when a class is converted
+        """
+        corpus = {}
+        for entry in pipeline.load(input_path):
+            class_id = entry.get('class_id', 'null')
+            if class_id == 'null':
+                continue
+            corpus[class_id] = pipeline.parse_class(entry)
+        return cls(corpus, pipeline, cache_size)
+
+    def resolve(self, item) -> tuple:
+        """
+        Cache key, class_id and frame analyses of a request item, which is
+        {"class_id": ...} or {"class": <VerbNet class JSON>}, with optional "frames" indexes
+        """
+        if not isinstance(item, dict):
+            raise RequestError(400, "request must be an object with 'class_id' or 'class'")
+        frames = item.get('frames')
+        if frames is not None and not (isinstance(frames, list)
+                                       and all(is_frame_index(i) for i in frames)):
+            raise RequestError(400, "'frames' must be a list of frame indexes")
+
+        if 'class_id' in item:
+            class_id = item['class_id']
+            if not isinstance(class_id, str):
+                raise RequestError(400, "'class_id' must be a string")
+            if class_id not in self.corpus:
+                raise RequestError(404, f"unknown class_id '{class_id}'")
+            analyses = self.corpus[class_id]
+            key = ('class_id', class_id)
+        elif isinstance(item.get('class'), dict):
+            entry = item['class']
+            validate_class(entry)
+            class_id = entry['class_id']
+            analyses = self.pipeline.parse_class(entry)
+            digest = hashlib.sha256(json.dumps(entry, sort_keys=True).encode('utf-8')).hexdigest()
+            key = ('class', digest)
+        else:
+            raise RequestError(400, "request must have 'class_id' or 'class'")
+
+        if frames is not None:
+            if not all(-len(analyses) <= i < len(analyses) for i in frames):
+                raise RequestError(400, f"frame index out of range, '{class_id}' has {len(analyses)} frames")
+            analyses = [analyses[i] for i in frames]
+            key = (*key, tuple(frames))
+        return key, class_id, analyses
+
+    def convert(self, class_id: str, analyses: list) -> dict:
+        """
+        Action models of a class in the unfiltered STRIPS, filtered STRIPS and PDDL forms
+        """
+        pipeline = self.pipeline
+        # Warnings are collected for this call only, other threads keep printing theirs
+        with collect_warnings() as warnings:
+            class_id, analyses = pipeline.analyze_class({'class_id': class_id}, analyses)
+            strips_data = pipeline.action_model(class_id, analyses)
+            deduped = pipeline.deduplicate([strips_data])
+            pddl_model = pipeline.format(deduped)
+        # Records and tuples become plain JSON values once, the cached result is shared
+        return json.loads(json.dumps({
+            'class_id': class_id,
+            'unfiltered': strips_data,
+            'filtered': deduped,
+            'pddl': pddl_model,
+            'warnings': warnings,
+        }, default=to_json))
+
+    def process_batch(self, items: list) -> list:
+        """
+        Answers a batch of request items, items of the same class and frames are converted once.
+        Each answer is a result dict or a RequestError, an item that fails only fails its own answer.
+        """
+        self.stats['batches'] += 1
+        self.stats['items'] += len(items)
+        answers = []
+        for item in items:
+            try:
+                key, class_id, analyses = self.resolve(item)
+                result = self.results.get(key)
+                if result is None:
+                    self.stats['cache_misses'] += 1
+                    result = self.results[key] = self.convert(class_id, analyses)
+                    if len(self.results) > self.cache_size:
+                        self.results.popitem(last=False)
+                else:
+                    self.stats['cache_hits'] += 1
+                    self.results.move_to_end(key)
+                answers.append(result)
+            except RequestError as error:
+                self.stats['errors'] += 1
+                answers.append(error)
+            except Exception as error:
+                self.stats['errors'] += 1
+                self.stats['internal_errors'] += 1
+                answers.append(RequestError(500, f"{type(error).__name__}: {error}"))
+        # metrics() runs on the event loop, it reads this copy instead of the live counters
+        self.counters = dict(sorted(metrics.counters.items()))
+        return answers
+
+    def metrics(self) -> dict:
+        latencies = sorted(self.latencies)
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1e3 if latencies else None
+
+        return {
+            **self.stats,
+            'classes': len(self.corpus),
+            'cached_results': len(self.results),
+            'latency_ms': {
+                'count': len(latencies),
+                'mean': sum(latencies) / len(latencies) * 1e3 if latencies else None,
+                'p50': percentile(0.5),
+                'p95': percentile(0.95),
+                'max': latencies[-1] * 1e3 if latencies else None,
+            },
+            # Pipeline counters (frames, filtered predicates, contradictions, duplicates)
+            'counters': self.counters,
+        }
+
+
+class RequestBatcher:
+    """
+    Collects the items of concurrent requests for up to window seconds (or max_batch
+    items) and hands them to the service as one batch. Batches run one at a time
+    in a worker thread, so the event loop keeps accepting connections.
+    """
+    def __init__(self, service: ExtractionService, max_batch: int = 64, window: float = 0.002):
+        self.service = service
+        self.max_batch = max_batch
+        self.window = window
+        self.queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    async def submit(self, items: list) -> list:
+        loop = asyncio.get_running_loop()
+        futures = []
+        for item in items:
+            future = loop.create_future()
+            self.queue.put_nowait((item, future))
+            futures.append(future)
+        return await asyncio.gather(*futures)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                answers = await loop.run_in_executor(
+                    self.executor, self.service.process_batch, [item for item, _ in batch])
+            except Exception as error:
+                answers = [RequestError(500, f"{type(error).__name__}: {error}")] * len(batch)
+            for (_, future), answer in zip(batch, answers):
+                if not future.done():
+                    future.set_result(answer)
+
+
+async def read_request(reader: asyncio.StreamReader):
+    """
+    Reads one HTTP/1.1 request, returns (method, path, headers, body) or None at the end of the stream
+    """
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    try:
+        method, target, _ = request_line.decode('latin-1').split()
+    except ValueError:
+        raise RequestError(400, "malformed request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0) or 0)
+    if length > MAX_BODY_BYTES:
+        raise RequestError(413, f"request body over {MAX_BODY_BYTES} bytes")
+    body = await reader.readexactly(length) if length else b''
+    return method, target.split('?', 1)[0], headers, body
+
+
+def write_response(writer: asyncio.StreamWriter, status: int, payload, keep_alive: bool):
+    body = json.dumps(payload).encode('utf-8')
+    writer.write(f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                 f"Content-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n"
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1'))
+    writer.write(body)
+
+
+async def handle_extract(batcher: RequestBatcher, body: bytes) -> tuple:
+    """
+    POST /extract with one request item or a list of them
+    """
+    try:
+        payload = json.loads(body or b'null')
+    except ValueError:
+        raise RequestError(400, "request body is not valid JSON")
+    items = payload if isinstance(payload, list) else [payload]
+    answers = await batcher.submit(items)
+    if isinstance(payload, list):
+        return 200, [answer.to_dict() if isinstance(answer, RequestError) else answer
+                     for answer in answers]
+    if isinstance(answers[0], RequestError):
+        raise answers[0]
+    return 200, answers[0]
+
+
+async def handle_connection(batcher: RequestBatcher, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter):
+    service = batcher.service
+    keep_alive = True
+    try:
+        while keep_alive:
+            try:
+                request = await read_request(reader)
+            except (RequestError, ValueError) as error:
+                error = error if isinstance(error, RequestError) else RequestError(400, str(error))
+                write_response(writer, error.status, error.to_dict(), keep_alive=False)
+                break
+            if request is None:
+                break
+            method, path, headers, body = request
+            keep_alive = headers.get('connection', '').lower() != 'close'
+            start = time.perf_counter()
+            service.stats['requests'] += 1
+            try:
+                if path == '/extract':
+                    if method != 'POST':
+                        raise RequestError(405, "use POST /extract")
+                    status, payload = await handle_extract(batcher, body)
+                    service.latencies.append(time.perf_counter() - start)
+                elif path == '/metrics' and method == 'GET':
+                    status, payload = 200, service.metrics()
+                elif path == '/health' and method == 'GET':
+                    status, payload = 200, {'status': 'ok', 'classes': len(service.corpus)}
+                elif path == '/classes' and method == 'GET':
+                    status, payload = 200, list(service.corpus)
+                else:
+                    raise RequestError(404, f"no route for {method} {path}")
+            except RequestError as error:
+                status, payload = error.status, error.to_dict()
+            write_response(writer, status, payload, keep_alive)
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(service: ExtractionService, host: str = '127.0.0.1', port: int = DEFAULT_PORT,
+                socket_path=None, max_batch: int = 64, batch_window: float = 0.002):
+    """
+    Serves the extraction service over HTTP on host:port, or on a Unix socket when socket_path is given
+    """
+    batcher = RequestBatcher(service, max_batch, batch_window)
+    batch_task = asyncio.create_task(batcher.run())
+
+    def handle(reader, writer):
+        return handle_connection(batcher, reader, writer)
+
+    if socket_path:
+        server = await asyncio.start_unix_server(handle, str(socket_path))
+        address = f"unix:{socket_path}"
+    else:
+        server = await asyncio.start_server(handle, host, port)
+        address = f"http://{host}:{port}"
+    print(f"Serving {len(service.corpus)} classes on {address}", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        batch_task.cancel()
+        batcher.executor.shutdown(wait=False)
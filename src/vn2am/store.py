@@ -0,0 +1,211 @@
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+from vn2am.converter import format_filterd_2_pddl
+from vn2am.model import get_condition_constants
+
+# File layout, every section is an array of little-endian uint32:
+#   header      MAGIC, then the number of items of each section
+#   strings     offsets of the strings in the string data (one more than the strings)
+#   classes     (class_id, first frame, frame count) per class
+#   frames      (first argument, argument count, first condition,
+#                precondition count, postcondition count) per frame,
+#               the postconditions follow the preconditions
+#   conditions  (bool value, predicate, first argument, argument count,
+#                constant count) per condition, the constant values follow the arguments
+#   arguments   string index of each frame argument, condition argument and constant value
+#   string data utf-8 text of all strings
+MAGIC = b'VN2AMST2'
+_HEADER = struct.Struct('<8s6I')
+_CLASS_SIZE = 3
+_FRAME_SIZE = 5
+_CONDITION_SIZE = 5
+
+
+class StringTable:
+    """
+    Interns strings while the store is built
+    """
+    def __init__(self):
+        self.index = {}
+        self.strings = []
+
+    def add(self, text: str) -> int:
+        i = self.index.get(text)
+        if i is None:
+            i = self.index[text] = len(self.strings)
+            self.strings.append(text)
+        return i
+
+
+def _to_little_endian(values: array) -> bytes:
+    if sys.byteorder == 'big':
+        values = array('I', values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def write_action_model_store(data: list, path):
+    """
+    Writes the filtered action models (the dedup output) as a binary store
+    """
+    strings = StringTable()
+    classes = array('I')
+    frames = array('I')
+    conditions = array('I')
+    arguments = array('I')
+
+    for entry in data:
+        frame_list = entry.get('frames', [])
+        classes.extend((strings.add(entry.get('class_id', 'null')), len(frames) // _FRAME_SIZE, len(frame_list)))
+        for frame in frame_list:
+            frame_args = frame.get('arguments', [])
+            preconditions = frame.get('preconditions', [])
+            postconditions = frame.get('postconditions', [])
+            frames.extend((len(arguments), len(frame_args), len(conditions) // _CONDITION_SIZE,
+                           len(preconditions), len(postconditions)))
+            arguments.extend(strings.add(arg) for arg in frame_args)
+            for cond in preconditions + postconditions:
+                bool_value, predicate, args = cond[:3]
+                constants = get_condition_constants(cond)
+                conditions.extend((strings.add(bool_value), strings.add(predicate), len(arguments), len(args),
+                                   len(constants)))
+                arguments.extend(strings.add(arg) for arg in args)
+                arguments.extend(strings.add(value) for value in constants)
+
+    encoded = [text.encode('utf-8') for text in strings.strings]
+    string_offsets = array('I', [0])
+    for text in encoded:
+        string_offsets.append(string_offsets[-1] + len(text))
+
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, len(encoded), len(classes) // _CLASS_SIZE, len(frames) // _FRAME_SIZE,
+                             len(conditions) // _CONDITION_SIZE, len(arguments), string_offsets[-1]))
+        for section in (string_offsets, classes, frames, conditions, arguments):
+            f.write(_to_little_endian(section))
+        for text in encoded:
+            f.write(text)
+
+
+class ActionModelStore:
+    """
+    Read-only view of a binary action model store. The file is memory mapped
+    and only the classes that are accessed are decoded, so opening a store
+    does not depend on its size.
+    """
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, string_count, class_count, frame_count, condition_count, argument_count, data_size = \
+            _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not an action model store")
+
+        offset = _HEADER.size
+        sections = []
+        for count in (string_count + 1, class_count * _CLASS_SIZE, frame_count * _FRAME_SIZE,
+                      condition_count * _CONDITION_SIZE, argument_count):
+            sections.append(self._uint32_section(offset, count))
+            offset += count * 4
+        self._string_offsets, self._classes, self._frames, self._conditions, self._arguments = sections
+        self._string_data = memoryview(self._mmap)[offset:offset + data_size]
+        self._strings = {}
+        self._class_index = None
+
+    def _uint32_section(self, offset: int, count: int):
+        view = memoryview(self._mmap)[offset:offset + count * 4]
+        if sys.byteorder == 'little':
+            return view.cast('I')
+        # Big-endian hosts read a swapped copy
+        values = array('I', view.tobytes())
+        values.byteswap()
+        return values
+
+    def close(self):
+        # Views must be released before the map is closed
+        for view in (self._string_offsets, self._classes, self._frames, self._conditions,
+                     self._arguments, self._string_data):
+            if isinstance(view, memoryview):
+                view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def string(self, i: int) -> str:
+        text = self._strings.get(i)
+        if text is None:
+            start, end = self._string_offsets[i], self._string_offsets[i + 1]
+            text = self._strings[i] = str(self._string_data[start:end], 'utf-8')
+        return text
+
+    def _strings_at(self, first: int, count: int) -> list:
+        return [self.string(i) for i in self._arguments[first:first + count]]
+
+    def __len__(self) -> int:
+        return len(self._classes) // _CLASS_SIZE
+
+    def class_ids(self) -> list:
+        return [self.string(self._classes[i * _CLASS_SIZE]) for i in range(len(self))]
+
+    def class_position(self, class_id: str) -> int:
+        """
+        Position of a class in the store, the index is built on first use
+        """
+        if self._class_index is None:
+            self._class_index = {class_id: i for i, class_id in enumerate(self.class_ids())}
+        return self._class_index[class_id]
+
+    def _condition(self, i: int) -> list:
+        bool_value, predicate, first_arg, arg_count, constant_count = \
+            self._conditions[i * _CONDITION_SIZE:(i + 1) * _CONDITION_SIZE]
+        cond = [self.string(bool_value), self.string(predicate), self._strings_at(first_arg, arg_count)]
+        if constant_count:
+            cond.append(self._strings_at(first_arg + arg_count, constant_count))
+        return cond
+
+    def _frame(self, i: int) -> dict:
+        first_arg, arg_count, first_cond, pre_count, post_count = \
+            self._frames[i * _FRAME_SIZE:(i + 1) * _FRAME_SIZE]
+        return {
+            'arguments': self._strings_at(first_arg, arg_count),
+            'preconditions': [self._condition(c) for c in range(first_cond, first_cond + pre_count)],
+            'postconditions': [self._condition(c) for c in range(first_cond + pre_count,
+                                                                 first_cond + pre_count + post_count)],
+        }
+
+    def get_class(self, key) -> dict:
+        """
+        Class by position or class_id, in the same form as the filtered STRIPS output
+        """
+        i = self.class_position(key) if isinstance(key, str) else key
+        if not -len(self) <= i < len(self):
+            raise IndexError(f"class {key} out of range")
+        i %= len(self)
+        class_id, first_frame, frame_count = self._classes[i * _CLASS_SIZE:(i + 1) * _CLASS_SIZE]
+        return {
+            'class_id': self.string(class_id),
+            'frames': [self._frame(f) for f in range(first_frame, first_frame + frame_count)],
+        }
+
+    def __getitem__(self, key) -> dict:
+        return self.get_class(key)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.get_class(i)
+
+    def get_pddl(self, key) -> list:
+        """
+        PDDL form of the frames of a class, as in the PDDL output
+        """
+        return format_filterd_2_pddl([self.get_class(key)])
+
+    def to_list(self) -> list:
+        return list(self)
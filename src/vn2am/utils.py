@@ -1,10 +1,9 @@
 from vn2am.semantic_tree import find_closest_common_ancestor
-from pathlib import Path
+from vn2am.hierarchy import ThemroleHierarchy, load_hierarchy, SEMANTIC_TREE_PATH
 import json
 
 
-src_dir = Path(__file__).parent
-semanticrole_hierarchy_dir = src_dir.parent/"data"/"vn_semanticrole_hierarchy.json"
+semanticrole_hierarchy_dir = SEMANTIC_TREE_PATH
 
 
 def get_argument_without_type(frame: dict) -> list:
@@ -51,8 +50,13 @@ def formatted_predicate(predicate: list) -> list:
 
     # add themrole of args based on their type
     args_themrole = []
+    constants = []
     for arg in args:
-        if (arg[0] != 'Event' and arg[0] != 'Constant'):
+        if arg[0] == 'Constant':
+            # Written as 'Constant', the value is kept in the constants of the condition
+            args_themrole.append(arg[0])
+            constants.append(arg[1])
+        elif arg[0] != 'Event':
             trimed_arg = remove_themrole_mark(arg[1])
             args_themrole.append(trimed_arg)
         else:
@@ -67,6 +71,8 @@ def formatted_predicate(predicate: list) -> list:
     
     formatted_condition = (bool_value, predicate_name,
                            tuple(args_themrole))
+    if constants:
+        formatted_condition += (tuple(constants),)
     return formatted_condition
 
 
@@ -160,8 +166,8 @@ def load_themroles(tree_path=semanticrole_hierarchy_dir):
     return themrole_tree_set
 
 
-def compare_predicate_args(args1, args2, value_to_node):
-    themrole_set = load_themroles()
+def compare_predicate_args(args1, args2, value_to_node, themroles: frozenset = None):
+    themrole_set = themroles if themroles is not None else load_hierarchy().themroles
     if len(args1) != len(args2):
         return False
     for i, arg in enumerate(args1):
@@ -177,21 +183,22 @@ def compare_predicate_args(args1, args2, value_to_node):
     return True
 
 
-def find_cond1_in_cond2(cond1, cond2, value_to_node):
+def find_cond1_in_cond2(cond1, cond2, value_to_node, themroles: frozenset = None):
     """
     if cond2 contains any predicate of cond1
     """
-    bool_val, pred_name, args = cond1
+    bool_val, pred_name, args = cond1[:3]
 
-    for other_bool, other_name, other_args in cond2:
+    for other_bool, other_name, other_args, *_ in cond2:
         if other_bool != bool_val or other_name != pred_name:
             continue
-        if compare_predicate_args(args, other_args, value_to_node):
+        if compare_predicate_args(args, other_args, value_to_node, themroles):
             return True
     return False
     
 
-def link_pre_to_post(preconditions, am_data, value_to_node):
+def link_pre_to_post(preconditions, am_data, value_to_node, hierarchy: ThemroleHierarchy = None):
+    themroles = hierarchy.themroles if hierarchy else None
     pre_links = {}
     for precond in preconditions:
         links = []
@@ -202,7 +209,7 @@ def link_pre_to_post(preconditions, am_data, value_to_node):
                 other_cond = frame.get("postconditions", [])
                 if len(other_cond) == 0:
                     raise ValueError("Valid action model always have postcondition")
-                found_link =  find_cond1_in_cond2(precond, other_cond, value_to_node)
+                found_link =  find_cond1_in_cond2(precond, other_cond, value_to_node, themroles)
                 if found_link:
                     links.append(f'{verb}-{i}')
         precond_name = f"{'not' if precond[0] == 'not' else ''}{precond[1]}({','.join(precond[2])})"
@@ -210,7 +217,8 @@ def link_pre_to_post(preconditions, am_data, value_to_node):
     return pre_links
 
 
-def link_post_to_pre(postconditions, am_data, value_to_node):
+def link_post_to_pre(postconditions, am_data, value_to_node, hierarchy: ThemroleHierarchy = None):
+    themroles = hierarchy.themroles if hierarchy else None
     post_links = {}
     for postcond in postconditions:
         link_count = []
@@ -221,7 +229,7 @@ def link_post_to_pre(postconditions, am_data, value_to_node):
                 other_cond = frame.get("preconditions", -1)
                 if len(other_cond) == 0:
                     continue
-                found_link =  find_cond1_in_cond2(postcond, other_cond, value_to_node)
+                found_link =  find_cond1_in_cond2(postcond, other_cond, value_to_node, themroles)
                 if found_link:
                     link_count.append(f'{verb}-{i}')
         postcond_name = f"{'!' if postcond[0] == '!' else ''}{postcond[1]}({','.join(postcond[2])})"
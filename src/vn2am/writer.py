@@ -0,0 +1,66 @@
+import json
+from pathlib import Path
+
+# json: indented array, the same text as json.dump(items, f, indent=2)
+# compact: array without indentation or spaces
+# jsonl: one compact item per line
+OUTPUT_FORMATS = ('json', 'compact', 'jsonl')
+COMPACT_SEPARATORS = (',', ':')
+
+
+def get_output_path(path, output_format: str = 'json') -> Path:
+    """
+    JSON Lines outputs use the .jsonl suffix
+    """
+    path = Path(path)
+    return path.with_suffix('.jsonl') if output_format == 'jsonl' else path
+
+
+class JSONArrayWriter:
+    """
+    Writes a JSON array one item at a time, so the items never have to be
+    held in memory together and readers can start before the array ends.
+    """
+    def __init__(self, path, output_format: str = 'json', default=None):
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"unknown output format '{output_format}'")
+        self.path = get_output_path(path, output_format)
+        self.output_format = output_format
+        self.default = default
+        self.count = 0
+        self.file = open(self.path, 'w', encoding='utf-8')
+
+    def encode(self, item) -> str:
+        if self.output_format == 'json':
+            # Items of an indented array are indented one more level
+            return json.dumps(item, indent=2, default=self.default).replace('\n', '\n  ')
+        return json.dumps(item, separators=COMPACT_SEPARATORS, default=self.default)
+
+    def write(self, item):
+        text = self.encode(item)
+        if self.output_format == 'jsonl':
+            self.file.write(text + '\n')
+        elif self.output_format == 'json':
+            self.file.write(('[\n  ' if self.count == 0 else ',\n  ') + text)
+        else:
+            self.file.write(('[' if self.count == 0 else ',') + text)
+        self.count += 1
+
+    def write_all(self, items):
+        for item in items:
+            self.write(item)
+
+    def close(self):
+        if self.file.closed:
+            return
+        if self.output_format == 'json':
+            self.file.write('\n]' if self.count else '[]')
+        elif self.output_format == 'compact':
+            self.file.write(']' if self.count else '[]')
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,93 @@
+"""
+Equivalence of the condition extraction with the list based bookkeeping of the
+baseline converter, loaded from git history, on random semantic lists where
+keys repeat and bool values contradict often.
+"""
+import random
+import subprocess
+import types
+from pathlib import Path
+
+import pytest
+
+from vn2am import converter
+from vn2am.converter import get_all_condition, get_all_condition_with_activity, split_pre_post_conditions
+from vn2am.model import Argument, Semantic
+
+# Commit of the converter before the postcondition bookkeeping changes
+BASELINE_COMMIT = 'bf25748'
+CONVERTER_PATH = 'src/vn2am/converter.py'
+
+PREDICATES = ['has_location', 'has_state', 'has_possession', 'motion', 'do', 'cause', 'degradation_material_integrity']
+EVENT_TAGS = ['e1', 'e2', 'e3', 'e4', 'ë1', 'E']
+VALUES = ['Agent', 'Theme', 'Destination', 'Source', '?Initial_Location', 'Patient']
+
+
+@pytest.fixture(scope='module')
+def baseline():
+    """
+    The baseline converter module, its predicate files are read from the current tree
+    """
+    root_dir = Path(__file__).parent.parent
+    try:
+        source = subprocess.run(
+            ['git', 'show', f'{BASELINE_COMMIT}:{CONVERTER_PATH}'], cwd=root_dir,
+            capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        pytest.skip(f"the baseline converter needs the git history ({BASELINE_COMMIT})")
+    module = types.ModuleType('baseline_converter')
+    # The baseline reads the predicate files from ../data next to its own directory
+    module.__file__ = str(Path(converter.__file__).parent/'baseline'/'converter.py')
+    exec(compile(source, f'{BASELINE_COMMIT}:{CONVERTER_PATH}', 'exec'), module.__dict__)
+    return module
+
+
+def random_semantic(rng: random.Random, values: list) -> Semantic:
+    events = rng.choice([(), (rng.choice(EVENT_TAGS),), (rng.choice(EVENT_TAGS),),
+                         (rng.choice(EVENT_TAGS), rng.choice(EVENT_TAGS))])
+    args = [Argument('Event', tag) for tag in events]
+    args += [Argument('ThemRole', rng.choice(values)) for _ in range(rng.randint(0, 2))]
+    return Semantic(events, rng.choice(PREDICATES), tuple(args), rng.choice([None, '!']))
+
+
+def random_semantic_list(rng: random.Random, length: int) -> list:
+    # A small value pool per list keeps keys colliding
+    values = rng.sample(VALUES, rng.randint(1, 3))
+    return [random_semantic(rng, values) for _ in range(length)]
+
+
+def random_event_index(semantic_list: list) -> dict:
+    event_index = {}
+    for arg_event, _, _, _ in semantic_list:
+        if len(arg_event) == 1 and arg_event[0] not in event_index:
+            event_index[arg_event[0]] = len(event_index)
+    return event_index
+
+
+def test_conditions_match_baseline(baseline):
+    rng = random.Random(0)
+    contradictions = 0
+    for i in range(5000):
+        semantic_list = random_semantic_list(rng, rng.choice([0, 1, 3, 8, 20, 60]))
+        event_index = random_event_index(semantic_list)
+        expected = baseline.get_all_condition(semantic_list)
+        assert get_all_condition(semantic_list) == expected, (i, semantic_list)
+        contradictions += expected[2]
+        for activity_event_tag in event_index:
+            assert get_all_condition_with_activity(semantic_list, event_index, activity_event_tag) == \
+                baseline.get_all_condition_with_activity(semantic_list, event_index, activity_event_tag), \
+                (i, activity_event_tag, semantic_list)
+    # The random lists must exercise the moves to preconditions
+    assert contradictions > 100
+
+
+def test_repeated_contradictions_move_the_first_appearance_once(baseline):
+    place = (Argument('ThemRole', 'Theme'), Argument('ThemRole', 'Destination'))
+    semantic_list = [Semantic(('e1',), 'has_location', place, None),
+                     Semantic(('e2',), 'has_location', place, '!'),
+                     Semantic(('e3',), 'has_location', place, None),
+                     Semantic(('e4',), 'has_location', place, '!')]
+    event_index = random_event_index(semantic_list)
+    assert split_pre_post_conditions(semantic_list, event_index, None) == \
+        baseline.get_pre_post_conditions(semantic_list, event_index) == \
+        ([semantic_list[0]], [semantic_list[1], semantic_list[3]])
@@ -0,0 +1,45 @@
+import json
+from vn2am.pddl import write_pddl_domain
+from vn2am.store import ActionModelStore, write_action_model_store
+from vn2am.utils import formatted_predicate
+
+
+def constant_data():
+    def frame(value):
+        semantic = (('e2',), 'has_emotional_state',
+                    (('Event', 'e2'), ('ThemRole', 'Patient'), ('Constant', value)), None)
+        return {'arguments': ['patient'], 'preconditions': [],
+                'postconditions': [formatted_predicate(semantic)]}
+
+    return [{'class_id': 'bully', 'frames': [frame('negative_emotion')]},
+            {'class_id': 'lure', 'frames': [frame('Enticed')]}]
+
+
+def test_constants_are_named_after_their_value(tmp_path):
+    data = constant_data()
+    # The filtered form keeps the placeholder and lists the constant values
+    assert data[0]['frames'][0]['postconditions'][0] == \
+        ('', 'has_emotional_state', ('Event', 'patient', 'Constant'), ('negative_emotion',))
+
+    path = tmp_path/"domain.pddl"
+    write_pddl_domain(data, path)
+    domain = path.read_text(encoding='utf-8')
+    assert "  (:constants\n    enticed negative_emotion\n  )\n" in domain
+    assert "(has_emotional_state ?patient negative_emotion)" in domain
+    assert "(has_emotional_state ?patient enticed)" in domain
+
+
+def test_constants_survive_the_json_and_store_outputs(tmp_path):
+    data = constant_data()
+    write_pddl_domain(data, tmp_path/"domain.pddl")
+
+    reloaded = json.loads(json.dumps(data))
+    write_pddl_domain(reloaded, tmp_path/"json.pddl")
+    write_action_model_store(data, tmp_path/"store.bin")
+    with ActionModelStore(tmp_path/"store.bin") as store:
+        assert store.to_list() == reloaded
+        write_pddl_domain(store.to_list(), tmp_path/"store.pddl")
+
+    domain = (tmp_path/"domain.pddl").read_text(encoding='utf-8')
+    assert (tmp_path/"json.pddl").read_text(encoding='utf-8') == domain
+    assert (tmp_path/"store.pddl").read_text(encoding='utf-8') == domain
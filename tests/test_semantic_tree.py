@@ -0,0 +1,53 @@
+import json
+from vn2am.hierarchy import SEMANTIC_TREE_PATH
+from vn2am.semantic_tree import SemanticTreeNode, build_semantic_graph, build_value_node_map, \
+    build_common_ancestor_table, find_closest_common_ancestor, search_closest_common_ancestor
+
+
+def load_nodes():
+    with open(SEMANTIC_TREE_PATH, 'r', encoding='utf-8') as f:
+        root = build_semantic_graph(json.load(f))
+    return list(build_value_node_map(root).values())
+
+
+def test_memoized_common_ancestor_matches_ancestor_walks():
+    nodes = load_nodes()
+    for node1 in nodes:
+        for node2 in nodes:
+            expected = search_closest_common_ancestor(node1, node2)
+            assert find_closest_common_ancestor(node1, node2) is expected, (node1.value, node2.value)
+            # Second lookup is answered from the cache
+            assert find_closest_common_ancestor(node1, node2) is expected
+
+
+def test_add_child_invalidates_memoized_ancestors():
+    root, left, right = SemanticTreeNode('root'), SemanticTreeNode('left'), SemanticTreeNode('right')
+    root.add_child(left)
+    assert find_closest_common_ancestor(left, right) is None
+
+    root.add_child(right)
+    assert find_closest_common_ancestor(left, right) is root
+
+
+def test_common_ancestor_table_matches_ancestor_walks():
+    nodes = load_nodes()
+    build_common_ancestor_table(nodes[0])
+    for node1 in nodes:
+        assert len(node1.common_ancestors) == len(nodes)
+        for node2 in nodes:
+            expected = search_closest_common_ancestor(node1, node2)
+            assert find_closest_common_ancestor(node1, node2) is expected, (node1.value, node2.value)
+
+
+def test_add_child_clears_common_ancestor_table():
+    root, left, right = SemanticTreeNode('root'), SemanticTreeNode('left'), SemanticTreeNode('right')
+    root.add_child(left)
+    other = SemanticTreeNode('other')
+    other.add_child(right)
+    build_common_ancestor_table(root)
+    build_common_ancestor_table(other)
+    assert find_closest_common_ancestor(left, right) is None
+
+    root.add_child(right)
+    assert not left.common_ancestors and not other.common_ancestors
+    assert find_closest_common_ancestor(left, right) is root
@@ -0,0 +1,79 @@
+from vn2am.pipeline import Pipeline
+from vn2am.service import ExtractionService, RequestError
+
+
+def make_class(class_id='put-9.1', value='Theme'):
+    def arg(arg_type, arg_value):
+        return {'arg_type': arg_type, 'value': arg_value}
+
+    return {'class_id': class_id, 'frames': [{
+        'examples': [{'example_text': 'I put the book on the table.'}],
+        'semantics': [
+            {'predicate': 'has_location', 'bool': None,
+             'args': [arg('Event', 'e1'), arg('ThemRole', value), arg('ThemRole', '?Initial_Location')]},
+            {'predicate': 'do', 'bool': None, 'args': [arg('Event', 'e2'), arg('ThemRole', 'Agent')]},
+            {'predicate': 'has_location', 'bool': '!',
+             'args': [arg('Event', 'e3'), arg('ThemRole', value), arg('ThemRole', '?Initial_Location')]},
+            {'predicate': 'has_location', 'bool': None,
+             'args': [arg('Event', 'e3'), arg('ThemRole', value), arg('ThemRole', 'Destination')]},
+        ]}]}
+
+
+def make_service():
+    return ExtractionService({}, Pipeline())
+
+
+def test_posted_class_is_converted():
+    service = make_service()
+    [answer] = service.process_batch([{'class': make_class()}])
+    assert answer['class_id'] == 'put-9.1'
+    assert answer['filtered'][0]['frames'][0]['postconditions'] == [
+        ['not', 'has_location', ['Event', 'theme', 'initial_location']],
+        ['', 'has_location', ['Event', 'theme', 'destination']]]
+    assert service.metrics()['counters']['frames'] == 1
+
+
+def test_bad_items_only_fail_their_own_answer():
+    service = make_service()
+    bad_items = [
+        {'class': make_class(class_id='foo')},
+        {'class': make_class(class_id=['put-9.1'])},
+        {'class': make_class(value=3)},
+        {'class_id': ['put-9.1']},
+        {'class': make_class(), 'frames': [True]},
+    ]
+    answers = service.process_batch([*bad_items, {'class': make_class()}])
+    for answer in answers[:-1]:
+        assert isinstance(answer, RequestError) and answer.status == 400, answer
+    assert answers[-1]['class_id'] == 'put-9.1'
+    assert service.metrics()['errors'] == len(bad_items)
+
+
+def test_unexpected_errors_become_internal_errors():
+    service = make_service()
+
+    def convert(class_id, analyses):
+        raise RuntimeError('boom')
+
+    service.convert = convert
+    answers = service.process_batch([{'class': make_class()}, {'class_id': 'put-9.1'}])
+    assert [answer.status for answer in answers] == [500, 404]
+    assert service.metrics()['internal_errors'] == 1
+
+
+def test_warnings_are_collected_per_request(capsys):
+    from concurrent.futures import ThreadPoolExecutor
+
+    contradicting = make_class()
+    contradicting['frames'][0]['semantics'].append(
+        {'predicate': 'has_location', 'bool': None,
+         'args': [{'arg_type': 'Event', 'value': 'e4'}, {'arg_type': 'ThemRole', 'value': 'Theme'},
+                  {'arg_type': 'ThemRole', 'value': '?Initial_Location'}]})
+    service = make_service()
+    items = [{'class': contradicting}, {'class': make_class(value='Patient')}] * 20
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        answers = list(executor.map(lambda item: service.convert(*service.resolve(item)[1:]), items))
+    for item, answer in zip(items, answers):
+        expected = 1 if item['class'] is contradicting else 0
+        assert len(answer['warnings']) == expected, answer
+    assert capsys.readouterr().out == ''